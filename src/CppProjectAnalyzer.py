@@ -1,14 +1,29 @@
+import os
 import re
+import sys
+import json
 import time
+import mmap
+import signal
 import subprocess
 import fnmatch
+from dataclasses import asdict, dataclass, field, is_dataclass
+from functools import partial
 from pathlib import Path
 from collections import defaultdict, Counter
 from typing import List, Dict, Any, Optional
+import asyncio
 import multiprocessing
 import concurrent.futures
 from config import *
-from build_analyzers import get_build_analyzer
+from build_analyzers import get_build_analyzer, build_file_index
+
+# Optional async file I/O: use aiofiles when available for the batched
+# read phase, otherwise fall back to synchronous reads
+try:
+    import aiofiles
+except Exception:
+    aiofiles = None
 
 # Optional progress bar: use tqdm when available, otherwise fall back to no-op
 try:
@@ -19,6 +34,286 @@ except Exception:
         return iterable
 
 
+# 预编译的正则表达式：分析是逐文件的热循环，重复 re.compile 纯属解释器开销。
+# 全部以字节模式编译：扫描的记号都是ASCII，直接在原始字节上匹配可以
+# 跳过整个文件的解码（读取阶段的主要CPU开销），仅对捕获的包含名解码
+_INCLUDE_RE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*[<"]([^>"]+)[">]', re.MULTILINE)
+_TEMPLATE_OPEN_RE = re.compile(rb"template\s*<")
+_FWD_DECL_RE = re.compile(rb"^\s*(class|struct)\s+\w+;", re.MULTILINE)
+
+# 字节记号计数模式：bytes 和 mmap 缓冲区都支持（mmap 没有 count 方法）
+_NEWLINE_RE = re.compile(rb"\n")
+
+
+def _build_complexity_scanner(enable_template_analysis: bool):
+    """按配置特化复杂度扫描器：合并为单个带命名分组的选择正则
+
+    原来每个贡献项各跑一遍正则（最多5次全文遍历），现在一次遍历，
+    按命中的分组名查权重累加；模板项是否参与在构建时就决定好，
+    热循环里不再有分支。
+    """
+    parts = []
+    weights = {}
+    if enable_template_analysis:
+        # 特化放在声明前：同一位置只会命中一个分支，
+        # 特化的权重取两项之和(3+2)以保持原有计分
+        parts.append(rb"(?P<tspec>template\s*<>\s*[^;{]+)")
+        weights["tspec"] = 5
+        parts.append(rb"(?P<tmpl>template\s*<[^>]*>)")
+        weights["tmpl"] = 3
+    parts.append(rb"(?P<inc>#include)")
+    weights["inc"] = 1
+    parts.append(rb"(?P<cls>(?:class|struct)\s+\w+)")
+    weights["cls"] = 2
+    parts.append(rb"(?P<func>\w+\s+\w+\s*\([^)]*\)\s*(?:\{|\[\[[^\]]*\]\]))")
+    weights["func"] = 1
+    parts.append(rb"(?P<mac>#define)")
+    weights["mac"] = 0.5
+    return re.compile(b"|".join(parts)), weights
+
+
+# 两种配置各特化一份，模块级缓存保证进程池 worker 也能直接复用
+_COMPLEXITY_SCANNERS = {
+    True: _build_complexity_scanner(True),
+    False: _build_complexity_scanner(False),
+}
+
+# 默认忽略的目录/文件模式
+_DEFAULT_IGNORE_PATTERNS = frozenset(
+    {
+        "build/",
+        "cmake-build-",
+        ".git/",
+        "third_party/",
+        "external/",
+        "test/",
+        "tests/",
+        "benchmark/",
+        "vendor/",
+        "node_modules/",
+        "__pycache__/",
+        ".vscode/",
+        ".vs/",
+        "Debug/",
+        "Release/",
+        "x64/",
+        "x86/",
+    }
+)
+
+# 识别为C++文件的扩展名（按用途分组，避免热循环里重建集合字面量）
+_CPP_SRC_EXTS = frozenset({".cpp", ".cc", ".cxx", ".c++", ".C"})
+_CPP_HDR_EXTS = frozenset({".h", ".hpp", ".hh", ".hxx", ".h++", ".inl"})
+_CPP_HDR_MAIN = frozenset({".h", ".hpp", ".hh"})
+_CPP_EXTS = _CPP_SRC_EXTS | _CPP_HDR_EXTS
+
+# 模板使用统计：单个带命名分组的选择正则，一次遍历替代三次 findall
+_TEMPLATE_ALT_RE = re.compile(
+    rb"(?P<decl>template\s*<[^>]*>)"
+    rb"|(?P<stl>std::\w+\s*<[^>]*>)"
+    rb"|(?P<boost>boost::\w+\s*<[^>]*>)"
+)
+_TEMPLATE_GROUP_LABELS = {
+    "decl": "模板声明",
+    "stl": "STL模板",
+    "boost": "Boost模板",
+}
+
+
+@dataclass
+class _FileStats:
+    """单个文件扫描结果：一次读取，供所有分析阶段共享"""
+
+    size: int = 0
+    lines: int = 0
+    includes: List[str] = field(default_factory=list)
+    forward_decls: int = 0
+    template_open_count: int = 0
+    complexity: int = 0
+    template_usage: Counter = field(default_factory=Counter)
+
+
+# 按优先级排列的编码列表，包含了更多常见的编码格式
+_ENCODINGS = (
+    'utf-8',           # 现代标准编码
+    'utf-8-sig',       # 带BOM的UTF-8
+    'gbk',             # 简体中文Windows默认编码
+    'gb2312',          # 简体中文编码
+    'gb18030',         # 中国国家标准编码
+    'big5',            # 繁体中文编码
+    'shift-jis',       # 日文编码
+    'euc-kr',          # 韩文编码
+    'latin1',          # 西欧编码
+    'iso-8859-1',      # ISO标准西欧编码
+    'iso-8859-2',      # ISO标准中欧编码
+    'cp1251',          # 俄文Windows编码
+    'cp1252',          # 西欧Windows编码
+    'ascii'            # ASCII编码
+)
+
+
+def _decode_with_encoding(data: bytes) -> str:
+    """按优先级尝试多种编码解码字节内容"""
+    for encoding in _ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            # LookupError表示Python不支持该编码
+            continue
+
+    # 如果所有编码都失败，则使用UTF-8并忽略错误
+    return data.decode('utf-8', errors='ignore')
+
+
+def _async_read_all(paths) -> Dict[Path, bytes]:
+    """异步批量读取文件原始字节内容
+
+    使用 aiofiles 把大量小文件的读取流水线化（信号量限制在途请求数），
+    使磁盘延迟相互重叠；aiofiles 不可用时退回同步逐个读取。
+    读取失败的文件不会出现在返回的字典中。
+    """
+    if aiofiles is None:
+        contents = {}
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    contents[path] = f.read()
+            except IOError as e:
+                print(f"⚠️  无法分析文件 {path}: {e}")
+        return contents
+
+    async def read_one(path, semaphore):
+        async with semaphore:
+            async with aiofiles.open(path, 'rb') as f:
+                return path, await f.read()
+
+    async def read_batch():
+        semaphore = asyncio.Semaphore(256)
+        results = await asyncio.gather(
+            *(read_one(path, semaphore) for path in paths),
+            return_exceptions=True,
+        )
+        contents = {}
+        for path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                print(f"⚠️  无法分析文件 {path}: {result}")
+            else:
+                contents[result[0]] = result[1]
+        return contents
+
+    return asyncio.run(read_batch())
+
+
+def _calculate_complexity(data: bytes, enable_template_analysis: bool = True) -> int:
+    """计算文件的复杂性分数（在原始字节缓冲区上计算）"""
+    # 超大文件只采样前512KB：对启发式分数已经足够，避免整缓冲区跑正则
+    if len(data) > 2_000_000:
+        data = data[: 512 * 1024]
+
+    pattern, weights = _COMPLEXITY_SCANNERS[enable_template_analysis]
+    complexity = 0.0
+    for match in pattern.finditer(data):
+        complexity += weights[match.lastgroup]
+
+    return int(complexity)
+
+
+# 小于该阈值的文件直接整体读入，mmap 的建立开销反而占主导
+_MMAP_THRESHOLD = 4096
+
+# 各构建系统对应的并行构建命令
+_PARALLEL_BUILD_CMDS = {
+    config.enums.BuildSystem.CMAKE: "cmake --build . --parallel",
+    config.enums.BuildSystem.MAKE: "make -j$(nproc)",
+    config.enums.BuildSystem.NINJA: "ninja -j$(nproc)",
+    config.enums.BuildSystem.QMAKE: "make -j$(nproc)",
+    config.enums.BuildSystem.MSBUILD: "msbuild /m",
+    config.enums.BuildSystem.BAZEL: "bazel build --jobs=$(nproc)",
+    config.enums.BuildSystem.MESON: "ninja -j$(nproc)",  # Meson通常使用Ninja作为后端
+}
+
+
+def _scan_file(file_path: Path, enable_template_analysis: bool = True) -> _FileStats:
+    """打开单个文件并在其原始字节上计算所有分析阶段需要的统计量
+
+    大文件通过 mmap 零拷贝地访问页缓存，小文件直接读入内存。
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        if size < _MMAP_THRESHOLD:
+            return _scan_buffer(f.read(), enable_template_analysis)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _scan_buffer(mm, enable_template_analysis)
+
+
+def _scan_buffer(data, enable_template_analysis: bool = True) -> _FileStats:
+    """在已读入的字节缓冲区（bytes 或 mmap）上计算扫描统计量
+
+    所有模式匹配都在字节层面完成，避免整个文件的编码解码；
+    只有捕获到的包含名走多编码回退解码。
+    """
+    template_usage = Counter()
+    if enable_template_analysis:
+        for match in _TEMPLATE_ALT_RE.finditer(data):
+            template_usage[_TEMPLATE_GROUP_LABELS[match.lastgroup]] += 1
+
+    size = len(data)
+    newlines = sum(1 for _ in _NEWLINE_RE.finditer(data))
+
+    return _FileStats(
+        size=size,
+        lines=newlines + (1 if size and data[size - 1 : size] != b"\n" else 0),
+        includes=[
+            _decode_with_encoding(name) for name in _INCLUDE_RE.findall(data)
+        ],
+        forward_decls=len(_FWD_DECL_RE.findall(data)),
+        template_open_count=len(_TEMPLATE_OPEN_RE.findall(data)),
+        complexity=_calculate_complexity(data, enable_template_analysis),
+        template_usage=template_usage,
+    )
+
+
+def _scan_chunk_worker(paths, enable_template_analysis: bool = True, timeout: int = 0):
+    """进程池 worker：扫描一批文件并在 worker 侧预聚合包含名计数
+
+    返回 (结果列表, 包含名Counter)。Counter(list) 走C实现的批量计数路径，
+    主进程归并时只需按批 update，而不是逐个包含名 += 1。
+    异常在 worker 内兜底并返回 None，避免单个坏文件中断整批 map 结果。
+
+    单文件超时在 worker 进程内部用间隔定时器实现（仅Unix）：
+    主进程对同步 worker 的 future 超时只能等结果返回后才触发，
+    真正能打断卡住的扫描的只有 worker 自己的 SIGALRM。
+    """
+    use_timer = timeout > 0 and hasattr(signal, "setitimer")
+    if use_timer:
+        def _on_alarm(signum, frame):
+            raise TimeoutError(f"单文件扫描超过 {timeout} 秒")
+
+        old_handler = signal.signal(signal.SIGALRM, _on_alarm)
+
+    results = []
+    all_includes = []
+    try:
+        for file_path in paths:
+            try:
+                if use_timer:
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+                stats = _scan_file(file_path, enable_template_analysis)
+            except Exception as e:
+                print(f"⚠️  分析失败 {file_path}: {e}")
+                results.append((file_path, None))
+                continue
+            finally:
+                if use_timer:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+            results.append((file_path, stats))
+            all_includes.extend(stats.includes)
+    finally:
+        if use_timer:
+            signal.signal(signal.SIGALRM, old_handler)
+    return results, Counter(all_includes)
+
+
 class CppProjectAnalyzer:
     def __init__(
         self,
@@ -34,6 +329,17 @@ class CppProjectAnalyzer:
         self.compiler = compiler
         self.build_system = build_system
         self.ignore_patterns = ignore_patterns or []
+        # 合并默认忽略模式和用户指定的模式，并编译为单个正则：
+        # 每个文件一次C级匹配，代替约20次Python级 fnmatch 调用
+        self._all_ignore_patterns = _DEFAULT_IGNORE_PATTERNS | set(
+            self.ignore_patterns
+        )
+        self._ignore_re = re.compile(
+            "|".join(
+                f"(?:{fnmatch.translate(pattern)})"
+                for pattern in sorted(self._all_ignore_patterns)
+            )
+        )
 
         self.analysis_config = analysis_config or AnalysisConfig()
         self.optimization_config = optimization_config or OptimizationConfig()
@@ -41,7 +347,7 @@ class CppProjectAnalyzer:
         # 分析数据
         self.files = []
         self.include_graph = defaultdict(set)
-        self.dependency_count = defaultdict(int)
+        self.dependency_count = Counter()
         self.file_sizes = {}
         self.header_frequency = Counter()
         self.template_usage = Counter()
@@ -49,8 +355,16 @@ class CppProjectAnalyzer:
         self.unused_headers = set()
         self.issues = []
         self.suggestions = []
+        self._suggestions_by_priority = defaultdict(list)  # 插入时按优先级分桶
         self.build_times_estimate = {}
         self.file_includes = defaultdict(list)  # 存储每个文件包含的所有头文件
+        self._file_stats = {}  # 每个文件只读取一次后的扫描结果缓存
+        self._header_index = defaultdict(list)  # 相对路径后缀 -> 候选文件
+        self._resolve_negative = set()  # 解析失败的包含名（负缓存）
+        self._path_intern = {}  # str -> 规范 Path 对象（驻留表）
+        self._header_paths = []  # 预筛出的头文件列表
+        self._source_paths = []  # 预筛出的源文件列表
+        self._file_index = None  # 按后缀分桶的全项目文件索引（供构建分析器共享）
 
         # 编译器特定配置
         self.compiler_config = config.compiler.COMPILER_CONFIGS
@@ -63,53 +377,83 @@ class CppProjectAnalyzer:
         self.external_lib_patterns = config.lib_buildtime_patterns.EXTERNAL_LIB
 
     def discover_files(self) -> List[Path]:
-        """发现项目中的所有C++文件"""
-        print("🔍 扫描C++项目文件...")
+        """发现项目中的所有C++文件
 
-        cpp_extensions = {".cpp", ".cc", ".cxx", ".c++", ".C"}
-        header_extensions = {".h", ".hpp", ".hh", ".hxx", ".h++", ".inl"}
+        单次 os.scandir 遍历代替逐扩展名的 glob（原先 9 个扩展名意味着
+        9 次完整目录树遍历），并在下潜前对被忽略目录剪枝。
+        """
+        print("🔍 扫描C++项目文件...")
 
         all_files = []
-        for ext in cpp_extensions | header_extensions:
-            pattern = f"**/*{ext}"
-            for file_path in self.project_path.glob(pattern):
-                if not self._should_ignore_file(file_path):
-                    all_files.append(file_path)
+        dir_stack = [str(self.project_path)]
+        while dir_stack:
+            current = dir_stack.pop()
+            try:
+                entries = os.scandir(current)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # 剪枝：被忽略的目录整个子树都不遍历
+                            if not self._should_ignore_dir(entry.name):
+                                dir_stack.append(entry.path)
+                        elif (
+                            entry.is_file(follow_symlinks=False)
+                            and os.path.splitext(entry.name)[1] in _CPP_EXTS
+                        ):
+                            file_path = Path(entry.path)
+                            if not self._should_ignore_file(file_path):
+                                all_files.append(file_path)
+                    except OSError:
+                        continue
 
         self.files = sorted(all_files)
+        # 规范 Path 驻留表：同一文件在各处聚合字典里共用同一个 Path 对象，
+        # Path 哈希只需算一次，也省掉大量重复对象
+        self._path_intern = {str(p): p for p in self.files}
+        # 按类别预筛一次，后面各建议/摘要阶段不再重复做后缀判断；
+        # Path.suffix 属性每次访问都要重新解析文件名，单趟循环只取一次
+        self._header_paths = []
+        self._source_paths = []
+        for p in self.files:
+            suffix = p.suffix
+            if suffix in _CPP_HDR_MAIN:
+                self._header_paths.append(p)
+            elif suffix in _CPP_SRC_EXTS:
+                self._source_paths.append(p)
+        self._build_header_index()
         print(f"📁 找到 {len(self.files)} 个C++文件")
         return self.files
 
-    def _should_ignore_file(self, file_path: Path) -> bool:
-        """检查是否应该忽略该文件"""
-        default_ignore_patterns = {
-            "build/",
-            "cmake-build-",
-            ".git/",
-            "third_party/",
-            "external/",
-            "test/",
-            "tests/",
-            "benchmark/",
-            "vendor/",
-            "node_modules/",
-            "__pycache__/",
-            ".vscode/",
-            ".vs/",
-            "Debug/",
-            "Release/",
-            "x64/",
-            "x86/",
-        }
+    def _build_header_index(self):
+        """为包含解析建立相对路径后缀索引，避免每个 #include 都遍历目录树
 
-        # 合并默认忽略模式和用户指定的模式
-        all_ignore_patterns = default_ignore_patterns | set(self.ignore_patterns)
-        file_str = str(file_path.relative_to(self.project_path))
+        形如 include/foo/bar.h 的文件会以 include/foo/bar.h、foo/bar.h、
+        bar.h 三个键登记，使 #include "foo/bar.h" 这类写法可以 O(1) 命中。
+        """
+        self._header_index = defaultdict(list)
+        self._resolve_negative = set()  # 解析失败的包含名（负缓存）
+
+        for file_path in self.files:
+            parts = file_path.relative_to(self.project_path).parts
+            for i in range(len(parts)):
+                self._header_index["/".join(parts[i:])].append(file_path)
 
+    def _should_ignore_dir(self, dir_name: str) -> bool:
+        """检查是否应该跳过整个目录（在遍历下潜前调用）"""
+        candidate = dir_name + "/"
         return any(
-            fnmatch.fnmatch(file_str, pattern) for pattern in all_ignore_patterns
+            candidate.startswith(pattern) or fnmatch.fnmatch(candidate, pattern)
+            for pattern in self._all_ignore_patterns
         )
 
+    def _should_ignore_file(self, file_path: Path) -> bool:
+        """检查是否应该忽略该文件"""
+        file_str = str(file_path.relative_to(self.project_path))
+        return bool(self._ignore_re.match(file_str))
+
     def analyze_project(self) -> Dict[str, Any]:
         """执行完整项目分析"""
         start_time = time.time()
@@ -149,130 +493,158 @@ class CppProjectAnalyzer:
     def _parallel_analyze_files(self):
         """并行分析文件"""
         print("📊 并行分析文件...")
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=multiprocessing.cpu_count()
+        # 正则扫描是纯CPU工作，线程池受GIL限制几乎无加速；
+        # 扫描在进程池 worker 中进行，结果在主进程归并
+        worker = partial(
+            _scan_chunk_worker,
+            enable_template_analysis=self.analysis_config.enable_template_analysis,
+            timeout=self.analysis_config.analysis_timeout,
+        )
+        workers = os.cpu_count() or 1
+        # 批量提交：大块任务摊薄每任务的 pickle/IPC 开销，
+        # 也避免为每个文件分配一个 Future 对象
+        chunksize = max(16, len(self.files) // (workers * 8))
+        chunks = [
+            self.files[i : i + chunksize]
+            for i in range(0, len(self.files), chunksize)
+        ]
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers
         ) as executor:
-            # 提交所有任务
-            futures = [executor.submit(self._analyze_file_includes, file_path) for file_path in self.files]
-            future_to_file = {f: p for f, p in zip(futures, self.files)}
+            results = executor.map(worker, chunks)
 
             # 使用 tqdm 来显示进度（若可用）
-            for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Analyzing files"):
-                file_path = future_to_file.get(future, None)
-                try:
-                    future.result(timeout=self.analysis_config.analysis_timeout)
-                except concurrent.futures.TimeoutError:
-                    print(f"⏰ 分析超时: {file_path}")
-                except Exception as e:
-                    print(f"⚠️  分析失败 {file_path}: {e}")
+            for chunk_results, include_counter in tqdm(
+                results, total=len(chunks), desc="Analyzing files"
+            ):
+                self.header_frequency.update(include_counter)
+                for path, stats in chunk_results:
+                    if stats is not None:
+                        self._merge_scan_result(path, stats, count_headers=False)
+        self._freeze_graph()
 
     def _sequential_analyze_files(self):
         """顺序分析文件"""
         print("📊 顺序分析文件...")
+        # 异步预读全部内容，让小文件读取相互重叠，再在主进程顺序解析
+        contents = _async_read_all(self.files)
         for file_path in tqdm(self.files, desc="Analyzing files"):
+            content = contents.get(file_path)
+            if content is None:
+                continue
             try:
-                self._analyze_file_includes(file_path)
+                stats = _scan_buffer(
+                    content, self.analysis_config.enable_template_analysis
+                )
+                self._merge_scan_result(file_path, stats)
             except Exception as e:
                 print(f"⚠️  分析失败 {file_path}: {e}")
+        self._freeze_graph()
 
-    def _analyze_file_includes(self, file_path: Path):
-        """分析单个文件的包含关系"""
-        include_pattern = re.compile(r'^\s*#\s*include\s*[<"]([^>"]+)[">]')
+    def _freeze_graph(self):
+        """扫描结束后把依赖图冻结为普通dict + tuple邻接表
 
-        try:
-            # 先尝试UTF-8编码，如果失败则回退到其他编码
-            content = self._read_file_with_encoding(file_path)
-            
-            # 分析文件大小
-            self.file_sizes[file_path] = len(content)
-
-            # 查找包含的头文件
-            includes = include_pattern.findall(content)
-            for included in includes:
-                # 记录头文件使用频率
-                self.header_frequency[included] += 1
-
-                # 尝试解析实际文件路径
-                resolved_path = self._resolve_include_path(file_path, included)
-                if resolved_path:
-                    self.include_graph[file_path].add(resolved_path)
-                    self.dependency_count[resolved_path] += 1
-            
-            self.file_includes[file_path] = includes
-            # 检测问题
-            self._detect_file_issues(file_path, content)
-
-        except IOError as e:
-            print(f"⚠️  无法分析文件 {file_path}: {e}")
-    
-    def _read_file_with_encoding(self, file_path: Path) -> str:
+        后续的环检测/未使用头文件等阶段都是只读遍历，
+        tuple迭代比set更快，也避免.get()的空set默认值反复分配。
         """
-        使用多种编码方式尝试读取文件
+        self.include_graph = {
+            k: tuple(v) for k, v in self.include_graph.items()
+        }
+
+    def _get_file_index(self) -> Dict[str, List[Path]]:
+        """懒构建并缓存按后缀分桶的项目文件索引
+
+        所有构建/编译器分析器共享同一份索引，整棵目录树只遍历一次，
+        而不是每个分析器各自 rglob 全树。
         """
-        # 按优先级排列的编码列表，包含了更多常见的编码格式
-        encodings = [
-            'utf-8',           # 现代标准编码
-            'utf-8-sig',       # 带BOM的UTF-8
-            'gbk',             # 简体中文Windows默认编码
-            'gb2312',          # 简体中文编码
-            'gb18030',         # 中国国家标准编码
-            'big5',            # 繁体中文编码
-            'shift-jis',       # 日文编码
-            'euc-kr',          # 韩文编码
-            'latin1',          # 西欧编码
-            'iso-8859-1',      # ISO标准西欧编码
-            'iso-8859-2',      # ISO标准中欧编码
-            'cp1251',          # 俄文Windows编码
-            'cp1252',          # 西欧Windows编码
-            'ascii'            # ASCII编码
-        ]
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except (UnicodeDecodeError, LookupError):
-                # LookupError表示Python不支持该编码
-                continue
-        
-        # 如果所有编码都失败，则使用UTF-8并忽略错误
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
+        if self._file_index is None:
+            self._file_index = build_file_index(str(self.project_path))
+        return self._file_index
+
+    def _get_file_stats(self, file_path: Path) -> _FileStats:
+        """获取单个文件的扫描统计（含复杂度），保证每个文件最多只扫描一次"""
+        stats = self._file_stats.get(file_path)
+        if stats is None:
+            stats = _scan_file(
+                file_path, self.analysis_config.enable_template_analysis
+            )
+            self._file_stats[file_path] = stats
+        return stats
+
+    def _merge_scan_result(
+        self, file_path: Path, stats: _FileStats, count_headers: bool = True
+    ):
+        """把单个文件的扫描结果归并到分析器的聚合状态中
+
+        并行路径的包含名计数已在 worker 侧批量聚合，传 count_headers=False
+        避免重复计数。
+        """
+        self._file_stats[file_path] = stats
+
+        # 分析文件大小
+        self.file_sizes[file_path] = stats.size
+
+        # 记录头文件使用频率（Counter.update 走C实现的批量计数路径）
+        if count_headers:
+            self.header_frequency.update(stats.includes)
+
+        # 尝试解析实际文件路径
+        resolved_paths = []
+        for included in stats.includes:
+            resolved_path = self._resolve_include_path(file_path, included)
+            if resolved_path:
+                self.include_graph[file_path].add(resolved_path)
+                resolved_paths.append(resolved_path)
+        if resolved_paths:
+            self.dependency_count.update(resolved_paths)
+
+        self.file_includes[file_path] = stats.includes
+        # 检测问题
+        self._detect_file_issues(file_path, stats)
 
     def _resolve_include_path(
         self, source_file: Path, include_name: str
     ) -> Optional[Path]:
-        """解析包含路径到实际文件"""
+        """解析包含路径到实际文件（基于预建索引，不做目录遍历）"""
         # 系统头文件
         if include_name.startswith("<") and ">" in include_name:
             return None
 
-        # 相对路径包含
-        if include_name.startswith('"'):
-            include_name = include_name.strip('"')
-            candidate = source_file.parent / include_name
-            if candidate.exists():
-                return candidate
-
-        # 在项目目录中搜索
-        for ext in ["", ".h", ".hpp", ".hh", ".hxx"]:
-            candidate_path = include_name + ext if ext else include_name
-            candidate = self.project_path / candidate_path
-            if candidate.exists():
-                return candidate
-
-            # 在子目录中搜索
-            for header_file in self.project_path.rglob(candidate_path):
-                if header_file.is_file():
-                    return header_file
+        include_name = include_name.strip('"')
+
+        # 相对于源文件所在目录的包含
+        candidate = source_file.parent / include_name
+        interned = self._path_intern.get(str(candidate))
+        if interned is not None:
+            return interned
+        if candidate.exists():
+            return candidate
 
+        if include_name in self._resolve_negative:
+            return None
+
+        # 项目索引命中（按相对路径后缀建立，见 _build_header_index）
+        candidates = self._header_index.get(include_name)
+        if candidates:
+            return candidates[0]
+
+        # 仅当包含名本身没有扩展名时（如 <vector> 风格的项目头），
+        # 才尝试补全常见头文件扩展名；带扩展名的写法以字面为准，
+        # 不做多余的猜测查找
+        if "." not in include_name.rsplit("/", 1)[-1]:
+            for ext in (".h", ".hpp", ".hh", ".hxx"):
+                candidates = self._header_index.get(include_name + ext)
+                if candidates:
+                    return candidates[0]
+
+        self._resolve_negative.add(include_name)
         return None
 
-    def _detect_file_issues(self, file_path: Path, content: str):
+    def _detect_file_issues(self, file_path: Path, stats: _FileStats):
         """检测文件级别的编译问题"""
-        include_count = len(re.findall(r"^\s*#\s*include", content, re.MULTILINE))
-        complexity_score = self._calculate_complexity(content)
-        file_size = len(content)
+        include_count = len(stats.includes)
+        complexity_score = stats.complexity
+        file_size = stats.size
 
         # 过多的头文件包含
         if include_count > self.analysis_config.max_header_includes:
@@ -300,7 +672,7 @@ class CppProjectAnalyzer:
 
         # 大型头文件
         if (
-            file_path.suffix in {".h", ".hpp", ".hh"}
+            file_path.suffix in _CPP_HDR_MAIN
             and file_size > self.analysis_config.max_header_size
         ):
             self.issues.append(
@@ -313,66 +685,73 @@ class CppProjectAnalyzer:
                 }
             )
 
-    def _calculate_complexity(self, content: str) -> int:
-        """计算文件的复杂性分数"""
-        complexity = 0
-
-        # 模板使用
-        if self.analysis_config.enable_template_analysis:
-            template_pattern = re.compile(r"template\s*<[^>]*>")
-            complexity += len(template_pattern.findall(content)) * 3
-
-            # 模板特化/偏特化
-            template_specialization = re.compile(r"template\s*<>\s*[^;{]+")
-            complexity += len(template_specialization.findall(content)) * 2
-
-        # 头文件包含数量
-        include_pattern = re.compile(r"^\s*#\s*include", re.MULTILINE)
-        complexity += len(include_pattern.findall(content))
-
-        # 类定义
-        class_pattern = re.compile(r"(class|struct)\s+\w+")
-        complexity += len(class_pattern.findall(content)) * 2
-
-        # 函数定义
-        function_pattern = re.compile(r"(\w+)\s+\w+\s*\([^)]*\)\s*(\{|\[\[[^\]]*\]\])")
-        complexity += len(function_pattern.findall(content))
-
-        # 宏定义
-        macro_pattern = re.compile(r"^\s*#\s*define\s+\w+", re.MULTILINE)
-        complexity += len(macro_pattern.findall(content)) * 0.5
-
-        return int(complexity)
-
     def _detect_circular_dependencies(self):
-        """检测循环依赖"""
-        print("🔄 检测循环依赖...")
-
-        visited = set()
-        recursion_stack = set()
-
-        def dfs(file_path):
-            if file_path in recursion_stack:
-                # 找到循环依赖
-                cycle_start = list(recursion_stack).index(file_path)
-                cycle = list(recursion_stack)[cycle_start:]
-                self.circular_deps.append(cycle)
-                return
+        """检测循环依赖（迭代式 Tarjan 强连通分量算法）
 
-            if file_path in visited:
-                return
-
-            visited.add(file_path)
-            recursion_stack.add(file_path)
+        使用显式栈避免深包含图触发 Python 递归深度限制；每个大小大于 1
+        的强连通分量（或自环）按真实包含顺序报告一次。
+        """
+        print("🔄 检测循环依赖...")
 
-            for dependency in self.include_graph.get(file_path, set()):
-                dfs(dependency)
+        index = {}  # 节点 -> 发现序号
+        lowlink = {}
+        on_stack = set()
+        path_stack = []
+        counter = 0
 
-            recursion_stack.remove(file_path)
+        for root in self.files:
+            if root in index:
+                continue
 
-        for file_path in self.files:
-            if file_path not in visited:
-                dfs(file_path)
+            # work_stack 条目: (节点, 该节点待处理的邻居迭代器)
+            work_stack = [(root, iter(self.include_graph.get(root, ())))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            path_stack.append(root)
+            on_stack.add(root)
+
+            while work_stack:
+                node, neighbors = work_stack[-1]
+                advanced = False
+                for dependency in neighbors:
+                    if dependency not in index:
+                        index[dependency] = lowlink[dependency] = counter
+                        counter += 1
+                        path_stack.append(dependency)
+                        on_stack.add(dependency)
+                        work_stack.append(
+                            (dependency, iter(self.include_graph.get(dependency, ())))
+                        )
+                        advanced = True
+                        break
+                    elif dependency in on_stack:
+                        lowlink[node] = min(lowlink[node], index[dependency])
+
+                if advanced:
+                    continue
+
+                work_stack.pop()
+                if work_stack:
+                    parent = work_stack[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    # 弹出一个完整的强连通分量
+                    component = []
+                    while True:
+                        member = path_stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    component.reverse()
+
+                    if len(component) > 1 or (
+                        component
+                        and component[0]
+                        in self.include_graph.get(component[0], ())
+                    ):
+                        self.circular_deps.append(component)
 
         if self.circular_deps:
             for i, cycle in enumerate(self.circular_deps):
@@ -396,7 +775,7 @@ class CppProjectAnalyzer:
             included_headers.update(dependencies)
 
         # 项目中的所有头文件
-        all_headers = {f for f in self.files if f.suffix in {".h", ".hpp", ".hh"}}
+        all_headers = set(self._header_paths)
 
         # 找到未被包含的头文件
         self.unused_headers = all_headers - included_headers
@@ -413,26 +792,13 @@ class CppProjectAnalyzer:
             )
 
     def _analyze_template_usage(self):
-        """分析模板使用情况"""
+        """分析模板使用情况（汇总扫描阶段的统计，不再重新读取文件）"""
         print("📐 分析模板使用...")
 
-        template_patterns = [
-            (r"template\s*<[^>]*>", "模板声明"),
-            (r"std::\w+\s*<[^>]*>", "STL模板"),
-            (r"boost::\w+\s*<[^>]*>", "Boost模板"),
-        ]
-
-        for file_path in tqdm(self.files, desc="Analyzing templates"):
-            try:
-                # 使用改进的文件读取方法
-                content = self._read_file_with_encoding(file_path)
-
-                for pattern, description in template_patterns:
-                    matches = re.findall(pattern, content)
-                    if matches:
-                        self.template_usage[description] += len(matches)
-            except Exception:
-                continue
+        for file_path in self.files:
+            stats = self._file_stats.get(file_path)
+            if stats is not None:
+                self.template_usage.update(stats.template_usage)
 
     def _estimate_build_times(self):
         """估算构建时间（基于文件行数）"""
@@ -442,94 +808,101 @@ class CppProjectAnalyzer:
         base_compile_time_per_line = 0.0005  # 经验值：0.5ms/行
 
         for file_path in tqdm(self.files, desc="Estimating build times"):
-            if file_path.suffix in {".cpp", ".cc", ".cxx"}:
+            if file_path.suffix in _CPP_SRC_EXTS:
                 try:
-                    # 使用改进的文件读取方法
-                    content = self._read_file_with_encoding(file_path)
-                    lines = content.splitlines()
-                    source_lines = len(lines)
+                    # 复用扫描阶段缓存的统计数据，不再重新读取文件
+                    stats = self._get_file_stats(file_path)
 
                     # 计算源文件本身的编译时间
-                    source_compile_time = source_lines * base_compile_time_per_line
+                    source_compile_time = stats.lines * base_compile_time_per_line
 
                     # 计算头文件带来的额外编译时间
                     header_compile_time = 0
-                    if file_path in self.file_includes:
-                        for header_str in self.file_includes[file_path]:
-                            header_lines = 0
-
-                            if header_str.startswith("<") and header_str.endswith(">"):
-                                # 系统头文件：查找预定义的行数或使用模式匹配
-                                header_lines = self.system_header_line_estimates.get(
-                                    header_str, 0
-                                )
-
-                                # 如果不在预定义列表中，尝试模式匹配
-                                if header_lines == 0:
-                                    for (
-                                        pattern,
-                                        default_lines,
-                                    ) in self.external_lib_patterns.items():
-                                        if pattern in header_str:
-                                            header_lines = default_lines
-                                            break
-
-                                # 如果仍未匹配，使用默认的系统头文件行数
-                                if header_lines == 0:
-                                    header_lines = 1000  # 默认系统头文件行数
-
-                            else:
-                                # 项目头文件：实际读取行数
-                                try:
-                                    resolved_path = self._resolve_include_path(
-                                        file_path, header_str
-                                    )
-                                    if resolved_path and resolved_path.exists():
-                                        # 使用改进的文件读取方法
-                                        header_content = self._read_file_with_encoding(resolved_path)
-                                        header_lines = len(header_content.splitlines())
-                                    else:
-                                        header_lines = 500  # 默认项目头文件行数
-                                except IOError:
-                                    header_lines = 500
-                            
-                            # 头文件编译时间（考虑包含开销，系统头文件开销较小）
-                            if header_str.startswith("<"):
-                                # 系统头文件：假设有较好的优化
-                                header_compile_time += (
-                                    header_lines * base_compile_time_per_line * 0.1
-                                )
-                            else:
-                                # 项目头文件：正常开销
-                                header_compile_time += (
-                                    header_lines * base_compile_time_per_line * 0.3
+                    for header_str in stats.includes:
+                        header_lines = 0
+
+                        if header_str.startswith("<") and header_str.endswith(">"):
+                            # 系统头文件：精确表 + 单次外部库模式扫描
+                            header_lines = config.lib_buildtime_patterns.lookup(
+                                header_str
+                            )
+
+                            # 如果仍未匹配，使用默认的系统头文件行数
+                            if header_lines == 0:
+                                header_lines = 1000  # 默认系统头文件行数
+
+                        else:
+                            # 项目头文件：优先使用扫描缓存中的行数
+                            try:
+                                resolved_path = self._resolve_include_path(
+                                    file_path, header_str
                                 )
+                                if resolved_path and (
+                                    resolved_path in self._file_stats
+                                    or resolved_path.exists()
+                                ):
+                                    header_lines = self._get_file_stats(
+                                        resolved_path
+                                    ).lines
+                                else:
+                                    header_lines = 500  # 默认项目头文件行数
+                            except IOError:
+                                header_lines = 500
+
+                        # 头文件编译时间（考虑包含开销，系统头文件开销较小）
+                        if header_str.startswith("<"):
+                            # 系统头文件：假设有较好的优化
+                            header_compile_time += (
+                                header_lines * base_compile_time_per_line * 0.1
+                            )
+                        else:
+                            # 项目头文件：正常开销
+                            header_compile_time += (
+                                header_lines * base_compile_time_per_line * 0.3
+                            )
 
                     # 复杂度惩罚因子
-                    complexity = self._calculate_complexity(content)
-                    complexity_penalty = 1 + (complexity * 0.02)
-                    
+                    complexity_penalty = 1 + (stats.complexity * 0.02)
+
                     # 模板使用惩罚
-                    template_penalty = 1 + (len(re.findall(r'template\s*<', content)) * 0.05)
-                    
+                    template_penalty = 1 + (stats.template_open_count * 0.05)
+
                     # 总编译时间估算
                     estimated_time = (source_compile_time + header_compile_time) * complexity_penalty * template_penalty
                     self.build_times_estimate[file_path] = estimated_time
-                    
+
                 except Exception as e:
                     print(f"⚠️  估算 {file_path} 编译时间时出错: {e}")
                     self.build_times_estimate[file_path] = 0
 
-    def generate_pch_header(self, pch_name: str = None) -> Path:
-        """生成预编译头文件"""
+    def _get_compiler_config(self) -> config.compiler.CompilerProfile:
+        """获取当前编译器的配置档案（未知编译器回退到GCC）"""
+        return self.compiler_config.get(
+            self.compiler, self.compiler_config[config.enums.Compiler.GCC]
+        )
+
+    def generate_pch_header(
+        self, pch_name: str = None, exclude: frozenset = frozenset()
+    ) -> Path:
+        """生成预编译头文件
+
+        `exclude` 中的头文件不会写入PCH，供体积超限时剔除重生成使用。
+        """
         pch_name = pch_name or self.optimization_config.pch_name
         print(f"🎯 生成预编译头文件: {pch_name}")
 
         # 获取最常用的头文件
         max_headers = self.analysis_config.pch_max_headers
         common_headers = self.header_frequency.most_common(max_headers)
-
-        pch_content = f"""// pch.h - Generated Precompiled Header
+        if exclude:
+            common_headers = [
+                (header, count)
+                for header, count in common_headers
+                if header not in exclude
+            ]
+
+        # 内容先收集为片段列表，最后一次拼接写出，避免逐段 += 的二次方拷贝
+        pch_parts = [f"""// pch.h - Generated Precompiled Header
 // Generated by C++ Project Analyzer (Cpp-Turbo-Compile)
 // Generate Time: {time.strftime('%Y-%m-%d %H:%M:%S')}
 // config.enums.Compiler: {self.compiler.value}
@@ -539,7 +912,7 @@ class CppProjectAnalyzer:
 #pragma once
 
 // The most useful system headers
-"""
+"""]
 
         # 分离系统头文件和项目头文件
         system_headers = []
@@ -553,32 +926,33 @@ class CppProjectAnalyzer:
                 # 项目头文件
                 project_headers.append((header, count))
 
-        # 按使用频率排序
-        system_headers.sort(key=lambda x: x[1], reverse=True)
-        project_headers.sort(key=lambda x: x[1], reverse=True)
+        # 按使用频率降序排序；频率相同时按估算行数降序、再按名字兜底，
+        # 使不同文件系统遍历顺序下的PCH内容完全一致（利于ccache复用），
+        # 且重量级头文件排在前面
+        def _pch_order(item):
+            header, count = item
+            return (-count, -config.lib_buildtime_patterns.lookup(header), header)
+
+        system_headers.sort(key=_pch_order)
+        project_headers.sort(key=_pch_order)
 
         # 添加系统头文件
         for header, count in system_headers:
             if header.startswith("<"):
-                pch_content += f"#include {header}  // times: {count}\n"
+                pch_parts.append(f"#include {header}  // times: {count}\n")
             else:
-                pch_content += f'#include "{header}"  // times: {count}\n'
+                pch_parts.append(f'#include "{header}"  // times: {count}\n')
 
         # 添加项目头文件
         if project_headers:
-            pch_content += "\n// Project headers\n"
+            pch_parts.append("\n// Project headers\n")
             for header, count in project_headers:
-                pch_content += f'#include "{header}"  // time: {count}\n'
-
-        # 安全地获取编译器配置，防止意外的KeyError
-        default_compiler = config.enums.Compiler.GCC
-        compiler_config = self.compiler_config.get(self.compiler, self.compiler_config[default_compiler])
+                pch_parts.append(f'#include "{header}"  // time: {count}\n')
 
-        pch_content += config.pch.PCH_SPECIAL_OPT
+        pch_parts.append(config.pch.PCH_SPECIAL_OPT)
 
         pch_file = self.project_path / pch_name
-        with open(pch_file, "w", encoding="utf-8") as f:
-            f.write(pch_content)
+        pch_file.write_text("".join(pch_parts), encoding="utf-8")
 
         print(f"✅ 预编译头文件已生成: {pch_file}")
         return pch_file
@@ -593,9 +967,7 @@ class CppProjectAnalyzer:
             print(f"❌ 预编译头文件不存在: {pch_file}")
             return False
 
-        compiler_config = self.compiler_config.get(
-            self.compiler, self.compiler_config[config.enums.Compiler.GCC]
-        )
+        compiler_config = self._get_compiler_config()
 
         try:
             if self.compiler in [
@@ -605,11 +977,10 @@ class CppProjectAnalyzer:
             ]:
                 # GCC/Clang/ICC PCH编译
                 # 使用get方法提供安全的默认值
-                pch_ext = compiler_config.get("pch_ext", ".gch")
-                pch_output = pch_file.with_suffix(pch_ext)
+                pch_output = pch_file.with_suffix(compiler_config.pch_ext)
                 cmd = [
                     self.compiler.value,
-                    *compiler_config["pch_flags"],
+                    *compiler_config.pch_flags,
                     "-std=c++17",
                     "-O2",
                     "-I.",
@@ -767,7 +1138,7 @@ win32:msvc {{
 # 在CMake中启用预编译头文件，Ninja会自动处理并行编译
 
 # 手动编译PCH的命令:
-# {self.compiler.value} -x c++-header {self.optimization_config.pch_name} -o {self.optimization_config.pch_name}{self.compiler_config.get(self.compiler, {}).get('pch_ext', '.gch')}
+# {self.compiler.value} -x c++-header {self.optimization_config.pch_name} -o {self.optimization_config.pch_name}{self._get_compiler_config().pch_ext}
 
 # 优化构建
 pool = console
@@ -806,7 +1177,7 @@ ninja_required_version = 1.7
 CXX = {self.compiler.value}
 CXXFLAGS = -std=c++17 -I. -Wall -Wextra
 PCH_HEADER = {self.optimization_config.pch_name}
-PCH_FILE = $(PCH_HEADER){self.compiler_config.get(self.compiler, {}).get('pch_ext', '.gch')}
+PCH_FILE = $(PCH_HEADER){self._get_compiler_config().pch_ext}
 
 # 预编译头文件规则
 $(PCH_FILE): $(PCH_HEADER)
@@ -889,31 +1260,41 @@ meson.add_install_script('post_install.py')
             if analyzer_cls:
                 try:
                     analyzer = analyzer_cls()
-                    result = analyzer.analyze(str(self.project_path))
+                    result = analyzer.analyze(
+                        str(self.project_path), file_index=self._get_file_index()
+                    )
                     if isinstance(result, dict):
                         extra = result.get("suggestions") or []
-                        if extra:
-                            # 标记来源并合并
-                            for s in extra:
-                                if "source" not in s:
-                                    s["source"] = "build_analyzer"
-                            self.suggestions.extend(extra)
+                        for s in extra:
+                            # 分析器返回精简的 Suggestion 对象，合并前转回字典并标记来源
+                            if is_dataclass(s):
+                                s = asdict(s)
+                            if "source" not in s:
+                                s["source"] = "build_analyzer"
+                            self._add_suggestion(s)
                 except Exception as e:
                     print(f"⚠️ 构建系统分析器运行失败: {e}")
         except Exception:
             # 若无法导入或选择分析器，则静默退回（不阻塞主流程）
             pass
 
+    def _add_suggestion(self, suggestion: Dict[str, Any]):
+        """追加建议并同步维护优先级分桶，报告阶段无需再扫全表"""
+        self.suggestions.append(suggestion)
+        priority = suggestion.get("priority")
+        if priority is not None:
+            self._suggestions_by_priority[priority].append(suggestion)
+
     def _suggest_forward_declarations(self):
         """建议使用前置声明"""
         highly_included_headers = [
             header
             for header, count in self.dependency_count.items()
-            if count > 5 and header.suffix in {".h", ".hpp", ".hh"}
+            if count > 5 and header.suffix in _CPP_HDR_MAIN
         ]
 
         for header in highly_included_headers:
-            self.suggestions.append(
+            self._add_suggestion(
                 {
                     "type": "FORWARD_DECLARATION",
                     "target": str(header),
@@ -926,13 +1307,13 @@ meson.add_install_script('post_install.py')
     def _suggest_pimpl_pattern(self):
         """建议使用PIMPL模式"""
         large_headers = [
-            file
-            for file, size in self.file_sizes.items()
-            if size > 15000 and file.suffix in {".h", ".hpp", ".hh"}
+            header
+            for header in self._header_paths
+            if self.file_sizes.get(header, 0) > 15000
         ]
 
         for header in large_headers:
-            self.suggestions.append(
+            self._add_suggestion(
                 {
                     "type": "PIMPL_PATTERN",
                     "target": str(header),
@@ -944,24 +1325,16 @@ meson.add_install_script('post_install.py')
 
     def _suggest_unified_headers(self):
         """建议统一头文件"""
-        header_files = [f for f in self.files if f.suffix in {".h", ".hpp", ".hh"}]
+        header_files = self._header_paths
 
         for header in header_files:
-            content = ""
-            try:
-                # 使用改进的文件读取方法
-                content = self._read_file_with_encoding(header)
-            except:
+            # 复用扫描阶段的统计数据，避免重新读取头文件
+            stats = self._file_stats.get(header)
+            if stats is None:
                 continue
 
-            # 检查是否主要是前置声明
-            forward_decls = len(
-                re.findall(r"^\s*(class|struct)\s+\w+;", content, re.MULTILINE)
-            )
-            includes = len(re.findall(r"^\s*#\s*include", content, re.MULTILINE))
-
-            if forward_decls > 5 and includes < 3:
-                self.suggestions.append(
+            if stats.forward_decls > 5 and len(stats.includes) < 3:
+                self._add_suggestion(
                     {
                         "type": "UNIFIED_HEADER",
                         "target": str(header),
@@ -1007,7 +1380,8 @@ meson.add_install_script('post_install.py')
                 }
             )
 
-        self.suggestions.extend(build_suggestions)
+        for suggestion in build_suggestions:
+            self._add_suggestion(suggestion)
 
     def _suggest_compiler_specific_optimizations(self):
         """建议编译器特定优化"""
@@ -1057,7 +1431,8 @@ meson.add_install_script('post_install.py')
             ],
         }
 
-        self.suggestions.extend(compiler_suggestions.get(self.compiler, []))
+        for suggestion in compiler_suggestions.get(self.compiler, []):
+            self._add_suggestion(suggestion)
 
     def _suggest_code_restructuring(self):
         """建议代码重构"""
@@ -1069,7 +1444,7 @@ meson.add_install_script('post_install.py')
         )[:5]
 
         for file_path, est_time in slow_files:
-            self.suggestions.append(
+            self._add_suggestion(
                 {
                     "type": "CODE_RESTRUCTURING",
                     "target": str(file_path),
@@ -1082,7 +1457,7 @@ meson.add_install_script('post_install.py')
     def _suggest_caching_strategies(self):
         """建议缓存策略"""
         if self.optimization_config.cache_compilation:
-            self.suggestions.append(
+            self._add_suggestion(
                 {
                     "type": "CACHING_STRATEGY",
                     "target": "PROJECT",
@@ -1094,22 +1469,12 @@ meson.add_install_script('post_install.py')
 
     def _get_parallel_build_command(self) -> str:
         """获取并行构建命令"""
-        commands = {
-            config.enums.BuildSystem.CMAKE: "cmake --build . --parallel",
-            config.enums.BuildSystem.MAKE: "make -j$(nproc)",
-            config.enums.BuildSystem.NINJA: "ninja -j$(nproc)",
-            config.enums.BuildSystem.QMAKE: "make -j$(nproc)",
-            config.enums.BuildSystem.MSBUILD: "msbuild /m",
-            config.enums.BuildSystem.BAZEL: "bazel build --jobs=$(nproc)",
-            config.enums.BuildSystem.MESON: "ninja -j$(nproc)",  # Meson通常使用Ninja作为后端
-        }
-        return commands.get(self.build_system, "make -j$(nproc) # 默认并行构建命令")
+        return _PARALLEL_BUILD_CMDS.get(
+            self.build_system, "make -j$(nproc) # 默认并行构建命令"
+        )
 
     def _get_analysis_summary(self) -> Dict[str, Any]:
         """获取分析摘要"""
-        header_files = [f for f in self.files if f.suffix in {".h", ".hpp", ".hh"}]
-        source_files = [f for f in self.files if f.suffix in {".cpp", ".cc", ".cxx"}]
-
         total_estimated_build_time = sum(self.build_times_estimate.values())
 
         return {
@@ -1118,8 +1483,8 @@ meson.add_install_script('post_install.py')
                 "compiler": self.compiler.value,
                 "build_system": self.build_system.value,
                 "total_files": len(self.files),
-                "header_files": len(header_files),
-                "source_files": len(source_files),
+                "header_files": len(self._header_paths),
+                "source_files": len(self._source_paths),
                 "estimated_build_time": total_estimated_build_time,
             },
             "analysis_results": {
@@ -1127,7 +1492,7 @@ meson.add_install_script('post_install.py')
                 "suggestions": len(self.suggestions),
                 "circular_deps": len(self.circular_deps),
                 "unused_headers": len(self.unused_headers),
-                "most_used_headers": dict(self.header_frequency.most_common(10)),
+                "most_used_headers": self.header_frequency.most_common(10),
                 "template_usage": dict(self.template_usage),
             },
         }
@@ -1137,36 +1502,39 @@ meson.add_install_script('post_install.py')
     ) -> Dict[str, Any]:
         """生成分析报告"""
         summary = self._get_analysis_summary()
-        print("\n" + "=" * 70)
-        print("📊 C++项目编译优化分析报告")
-        print("=" * 70)
+        # 整份报告先收集为行列表，最后一次性写出：
+        # 几十次 print 意味着几十次 stdout 加锁和 flush
+        out = []
+        out.append("\n" + "=" * 70)
+        out.append("📊 C++项目编译优化分析报告")
+        out.append("=" * 70)
 
         proj_info = summary["project_info"]
         analysis_results = summary["analysis_results"]
         external_libs_detected = set()
         for header in self.header_frequency:
             if header.startswith("<"):
-                for lib_pattern in self.external_lib_patterns:
-                    if lib_pattern in header:
-                        external_libs_detected.add(lib_pattern.rstrip("/"))
-
-        print(f"\n📈 项目统计:")
-        print(f"   项目路径: {proj_info['path']}")
-        print(f"   编译器: {proj_info['compiler']}")
-        print(f"   构建系统: {proj_info['build_system']}")
-        print(f"   总文件数: {proj_info['total_files']}")
-        print(f"   头文件: {proj_info['header_files']}")
-        print(f"   源文件: {proj_info['source_files']}")
-        print(f"   预估编译时间: {proj_info['estimated_build_time']:.2f}s")
-        print()
+                lib_pattern = config.lib_buildtime_patterns.match_external(header)
+                if lib_pattern is not None:
+                    external_libs_detected.add(lib_pattern.rstrip("/"))
+
+        out.append(f"\n📈 项目统计:")
+        out.append(f"   项目路径: {proj_info['path']}")
+        out.append(f"   编译器: {proj_info['compiler']}")
+        out.append(f"   构建系统: {proj_info['build_system']}")
+        out.append(f"   总文件数: {proj_info['total_files']}")
+        out.append(f"   头文件: {proj_info['header_files']}")
+        out.append(f"   源文件: {proj_info['source_files']}")
+        out.append(f"   预估编译时间: {proj_info['estimated_build_time']:.2f}s")
+        out.append("")
 
         if external_libs_detected:
-            print(f"   检测到的外部库: {', '.join(external_libs_detected)}")
+            out.append(f"   检测到的外部库: {', '.join(external_libs_detected)}")
         # 显示最常用的头文件
         if analysis_results["most_used_headers"]:
-            print(f"\n📋 最常用的头文件:")
-            for header, count in analysis_results["most_used_headers"].items():
-                print(f"   {header}: {count} 次")
+            out.append(f"\n📋 最常用的头文件:")
+            for header, count in analysis_results["most_used_headers"]:
+                out.append(f"   {header}: {count} 次")
 
         # 可能的编译瓶颈
         total_estimated_time = sum(self.build_times_estimate.values())
@@ -1177,13 +1545,13 @@ meson.add_install_script('post_install.py')
         )[:3]
 
         if slowest_files:
-            print(f"   编译瓶颈文件:")
+            out.append(f"   编译瓶颈文件:")
             for file_path, time_val in slowest_files:
-                print(f"     - {file_path}: {time_val:.2f}s")
+                out.append(f"     - {file_path}: {time_val:.2f}s")
 
         # 问题报告
         if self.issues:
-            print(f"\n❌ 检测到 {len(self.issues)} 个问题:")
+            out.append(f"\n❌ 检测到 {len(self.issues)} 个问题:")
             for issue in self.issues:
                 severity_icon = {
                     config.enums.Severity.LOW: "🔵",
@@ -1191,11 +1559,11 @@ meson.add_install_script('post_install.py')
                     config.enums.Severity.HIGH: "🔴",
                 }.get(issue["severity"], "⚪")
 
-                print(f"   {severity_icon} [{issue['severity'].name}] {issue['file']}")
-                print(f"       {issue['message']}")
-                print(f"       💡 建议: {issue['suggestion']}")
+                out.append(f"   {severity_icon} [{issue['severity'].name}] {issue['file']}")
+                out.append(f"       {issue['message']}")
+                out.append(f"       💡 建议: {issue['suggestion']}")
         else:
-            print(f"\n✅ 未发现严重编译问题")
+            out.append(f"\n✅ 未发现严重编译问题")
 
         # 优化建议
         if self.suggestions:
@@ -1204,97 +1572,110 @@ meson.add_install_script('post_install.py')
             other_suggestions = [s for s in self.suggestions if s.get("source") != "build_analyzer"]
 
             if build_analyzer_suggestions:
-                print(f"\n🔧 构建系统分析器建议 ({len(build_analyzer_suggestions)} 个):")
+                out.append(f"\n🔧 构建系统分析器建议 ({len(build_analyzer_suggestions)} 个):")
                 for s in build_analyzer_suggestions:
                     pri = s.get("priority", config.enums.Severity.MEDIUM)
-                    print(f"  - [{pri.name}] {s.get('message', s.get('description',''))}")
+                    out.append(f"  - [{pri.name}] {s.get('message', s.get('description',''))}")
                     if s.get("file"):
-                        print(f"      文件: {s.get('file')}")
+                        out.append(f"      文件: {s.get('file')}")
                     if s.get("action"):
-                        print(f"      → {s.get('action')}")
+                        out.append(f"      → {s.get('action')}")
 
-            # 普通建议按优先级分组显示
+            # 普通建议按优先级分组显示（单趟分桶，不对长列表扫三遍）
             if other_suggestions:
-                print(f"\n💡 其他优化建议 ({len(other_suggestions)} 个):")
+                out.append(f"\n💡 其他优化建议 ({len(other_suggestions)} 个):")
 
-                high_priority = [
-                    s for s in other_suggestions if s.get("priority") == config.enums.Severity.HIGH
-                ]
-                medium_priority = [
-                    s for s in other_suggestions if s.get("priority") == config.enums.Severity.MEDIUM
-                ]
-                low_priority = [
-                    s for s in other_suggestions if s.get("priority") == config.enums.Severity.LOW
-                ]
+                # 分桶在 _add_suggestion 插入时已维护好，这里直接取用
+                high_priority = self._suggestions_by_priority[config.enums.Severity.HIGH]
+                medium_priority = self._suggestions_by_priority[config.enums.Severity.MEDIUM]
+                low_priority = self._suggestions_by_priority[config.enums.Severity.LOW]
 
                 if high_priority:
-                    print("\n   🔴 高优先级:")
+                    out.append("\n   🔴 高优先级:")
                     for suggestion in high_priority:
-                        print(f"      {suggestion.get('description')}")
-                        print(f"      → {suggestion.get('action')}")
+                        out.append(f"      {suggestion.get('description')}")
+                        out.append(f"      → {suggestion.get('action')}")
 
                 if medium_priority:
-                    print("\n   🟡 中优先级:")
+                    out.append("\n   🟡 中优先级:")
                     for suggestion in medium_priority:
-                        print(f"      {suggestion.get('description')}")
-                        print(f"      → {suggestion.get('action')}")
+                        out.append(f"      {suggestion.get('description')}")
+                        out.append(f"      → {suggestion.get('action')}")
 
                 if low_priority:
-                    print("\n   🔵 低优先级:")
+                    out.append("\n   🔵 低优先级:")
                     for suggestion in low_priority:
-                        print(f"      {suggestion.get('description')}")
-                        print(f"      → {suggestion.get('action')}")
+                        out.append(f"      {suggestion.get('description')}")
+                        out.append(f"      → {suggestion.get('action')}")
+
+        sys.stdout.write("\n".join(out) + "\n")
 
         # 保存报告
-        if output_file and format == "text":
-            self._save_text_report(output_file, summary)
+        if output_file:
+            if format == "json":
+                self._save_json_report(output_file, summary)
+            else:
+                self._save_text_report(output_file, summary)
 
         return summary
 
+    def _save_json_report(self, output_file: str, summary: Dict[str, Any]):
+        """保存JSON报告
+
+        json.dump 直接对着文件句柄增量写出，不先在内存里拼整段字符串；
+        ensure_ascii=False 让中文建议原样落盘而不是转义序列。
+        """
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+        print(f"💾 JSON报告已保存至: {output_file}")
+
     def _save_text_report(self, output_file: str, summary: Dict[str, Any]):
         """保存文本报告"""
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("C++项目编译优化分析报告\n")
-            f.write("=" * 50 + "\n\n")
-
-            # 写入摘要
-            proj_info = summary["project_info"]
-            f.write("项目摘要:\n")
-            f.write(f"  项目路径: {proj_info['path']}\n")
-            f.write(f"  编译器: {proj_info['compiler']}\n")
-            f.write(f"  构建系统: {proj_info['build_system']}\n")
-            f.write(f"  总文件数: {proj_info['total_files']}\n")
-            f.write(f"  预估编译时间: {proj_info['estimated_build_time']:.2f}s\n\n")
-
-            # 写入问题
-            if self.issues:
-                f.write(f"检测到的问题 ({len(self.issues)} 个):\n")
-                for issue in self.issues:
-                    f.write(f"  [{issue['severity'].name}] {issue['file']}\n")
-                    f.write(f"     问题: {issue['message']}\n")
-                    f.write(f"     建议: {issue['suggestion']}\n\n")
-
-            # 写入建议：优先写入来自构建系统分析器的建议
-            if self.suggestions:
-                build_analyzer_suggestions = [s for s in self.suggestions if s.get('source') == 'build_analyzer']
-                other_suggestions = [s for s in self.suggestions if s.get('source') != 'build_analyzer']
-
-                if build_analyzer_suggestions:
-                    f.write(f"构建系统分析器建议 ({len(build_analyzer_suggestions)} 个):\n")
-                    for s in build_analyzer_suggestions:
-                        pri = s.get('priority', config.enums.Severity.MEDIUM)
-                        f.write(f"  [{pri.name}] {s.get('message', s.get('description',''))}\n")
-                        if s.get('file'):
-                            f.write(f"     文件: {s.get('file')}\n")
-                        if s.get('action'):
-                            f.write(f"     操作: {s.get('action')}\n")
-                        f.write("\n")
-
-                if other_suggestions:
-                    f.write(f"其他优化建议 ({len(other_suggestions)} 个):\n")
-                    for suggestion in other_suggestions:
-                        pri = suggestion.get('priority', config.enums.Severity.MEDIUM)
-                        f.write(f"  [{pri.name}] {suggestion.get('description')}\n")
-                        f.write(f"     操作: {suggestion.get('action')}\n\n")
+        # 先收集全部行，最后 writelines 一次写出，避免几十次小块 write
+        lines = []
+        lines.append("C++项目编译优化分析报告\n")
+        lines.append("=" * 50 + "\n\n")
+
+        # 写入摘要
+        proj_info = summary["project_info"]
+        lines.append("项目摘要:\n")
+        lines.append(f"  项目路径: {proj_info['path']}\n")
+        lines.append(f"  编译器: {proj_info['compiler']}\n")
+        lines.append(f"  构建系统: {proj_info['build_system']}\n")
+        lines.append(f"  总文件数: {proj_info['total_files']}\n")
+        lines.append(f"  预估编译时间: {proj_info['estimated_build_time']:.2f}s\n\n")
+
+        # 写入问题
+        if self.issues:
+            lines.append(f"检测到的问题 ({len(self.issues)} 个):\n")
+            for issue in self.issues:
+                lines.append(f"  [{issue['severity'].name}] {issue['file']}\n")
+                lines.append(f"     问题: {issue['message']}\n")
+                lines.append(f"     建议: {issue['suggestion']}\n\n")
 
+        # 写入建议：优先写入来自构建系统分析器的建议
+        if self.suggestions:
+            build_analyzer_suggestions = [s for s in self.suggestions if s.get('source') == 'build_analyzer']
+            other_suggestions = [s for s in self.suggestions if s.get('source') != 'build_analyzer']
+
+            if build_analyzer_suggestions:
+                lines.append(f"构建系统分析器建议 ({len(build_analyzer_suggestions)} 个):\n")
+                for s in build_analyzer_suggestions:
+                    pri = s.get('priority', config.enums.Severity.MEDIUM)
+                    lines.append(f"  [{pri.name}] {s.get('message', s.get('description',''))}\n")
+                    if s.get('file'):
+                        lines.append(f"     文件: {s.get('file')}\n")
+                    if s.get('action'):
+                        lines.append(f"     操作: {s.get('action')}\n")
+                    lines.append("\n")
+
+            if other_suggestions:
+                lines.append(f"其他优化建议 ({len(other_suggestions)} 个):\n")
+                for suggestion in other_suggestions:
+                    pri = suggestion.get('priority', config.enums.Severity.MEDIUM)
+                    lines.append(f"  [{pri.name}] {suggestion.get('description')}\n")
+                    lines.append(f"     操作: {suggestion.get('action')}\n\n")
+
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.writelines(lines)
         print(f"💾 文本报告已保存至: {output_file}")
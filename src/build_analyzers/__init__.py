@@ -13,22 +13,121 @@ This module provides:
 
 from __future__ import annotations
 
-import inspect
+import configparser
+import importlib
+import os
+import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Type
+from typing import Dict, FrozenSet, List, Optional, Type
 
 from config import enums
 
+from ._scan import contains_any, match_tokens
+
+
+# Directories that never contain hand-written build configuration;
+# skipped when indexing the project tree for analyzers
+_INDEX_SKIP_DIRS = frozenset({".git", "build", "node_modules"})
+
+
+def build_file_index(project_path: str) -> Dict[str, List[Path]]:
+    """Walk the project tree once and bucket files by suffix.
+
+    Analyzers share this index instead of each doing its own full
+    `rglob('*')` walk, so the tree is stat-ed exactly once no matter
+    how many analyzers run. Files without an extension (Makefile,
+    BUILD, build.ninja, ...) land in the '' bucket.
+    """
+    index: Dict[str, List[Path]] = {}
+    for dirpath, dirnames, filenames in os.walk(project_path, followlinks=False):
+        dirnames[:] = [d for d in dirnames if d not in _INDEX_SKIP_DIRS]
+        for name in filenames:
+            suffix = os.path.splitext(name)[1]
+            index.setdefault(suffix, []).append(Path(dirpath) / name)
+    return index
+
+
+def _project_has_token(file_index: Dict[str, List[Path]], suffixes, tokens) -> bool:
+    """Return True as soon as any candidate file contains any of `tokens`.
+
+    Tokens are raw bytes so files are searched without decoding; the scan
+    stops at the first hit, so the common positive case touches one file.
+    """
+    for suffix in suffixes:
+        for path in file_index.get(suffix, ()):
+            if contains_any(path, tokens):
+                return True
+    return False
+
+
+# Build-configuration suffixes worth scanning for compiler flags, and the
+# flag tokens every compiler analyzer cares about. GCC, Clang and ICC
+# probe the same candidate files for different tokens, so one combined
+# pass finds all of them and each analyzer checks its own subset.
+_FLAG_FILE_SUFFIXES = ('.txt', '.cmake', '.mk', '.make', '.pro', '.cfg')
+_COMPILER_FLAG_TOKENS = (b'-march=native', b'-flto', b'-ipo', b'-xHost')
+
+# Last (file_index, result) pair; analyzers sharing one index reuse the scan
+_last_flag_scan = None
+
+
+def scan_compiler_flags(file_index: Dict[str, List[Path]]) -> FrozenSet[bytes]:
+    """Return the compiler-flag tokens present anywhere in the build files.
+
+    Reads each candidate file once for all tokens instead of once per
+    analyzer; the result is memoized against the index object so sibling
+    compiler analyzers invoked with the same index pay for a single pass.
+    """
+    global _last_flag_scan
+    if _last_flag_scan is not None and _last_flag_scan[0] is file_index:
+        return _last_flag_scan[1]
+
+    found = set()
+    for suffix in _FLAG_FILE_SUFFIXES:
+        for path in file_index.get(suffix, ()):
+            found |= match_tokens(path, _COMPILER_FLAG_TOKENS)
+            if len(found) == len(_COMPILER_FLAG_TOKENS):
+                break
+        else:
+            continue
+        break
+
+    result = frozenset(found)
+    _last_flag_scan = (file_index, result)
+    return result
+
+
+# dataclass(slots=True) needs 3.10+; CI still runs 3.8/3.9, where the
+# plain layout is used instead (same gate as config.compiler)
+_SLOTS_KW = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS_KW)
+class Suggestion:
+    """One analyzer finding.
+
+    Slotted (on 3.10+) so a large scan does not pay a dict (with its
+    duplicated key strings) per suggestion; callers that need a plain
+    mapping can use `dataclasses.asdict`.
+    """
+
+    type: str
+    file: str
+    message: str
+
 
 class Analyzer:
     """Minimal Analyzer interface.
 
     Concrete analyzers should subclass this and implement `analyze()`.
     The `analyze()` method returns a dict with at least a `suggestions` key
-    containing a list of suggestion dicts.
+    containing a list of suggestion dicts. `file_index` is the shared
+    suffix-keyed index from `build_file_index`; analyzers build one
+    locally when invoked standalone without it.
     """
 
-    def analyze(self, project_path: str) -> dict:
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> dict:
         """Analyze the project at `project_path` and return results.
 
         Override in subclasses.
@@ -36,20 +135,32 @@ class Analyzer:
         raise NotImplementedError()
 
 
-# Import concrete analyzers after defining Analyzer to avoid circular imports
-from .cmake_analyzer import CMakeAnalyzer
-from .qmake_analyzer import QMakeAnalyzer
-from .ninja_analyzer import NinjaAnalyzer
-from .msbuild_analyzer import MSBuildAnalyzer
-from .make_analyzer import MakeAnalyzer
-from .bazel_analyzer import BazelAnalyzer
-from .meson_analyzer import MesonAnalyzer
+# Analyzer classes are imported lazily (PEP 562): one CLI run uses at most
+# one of the eleven modules, so eager imports were pure startup latency.
+# `from build_analyzers import CMakeAnalyzer` still works via __getattr__.
+_ANALYZER_MODULES = {
+    "CMakeAnalyzer": ".cmake_analyzer",
+    "QMakeAnalyzer": ".qmake_analyzer",
+    "NinjaAnalyzer": ".ninja_analyzer",
+    "MSBuildAnalyzer": ".msbuild_analyzer",
+    "MakeAnalyzer": ".make_analyzer",
+    "BazelAnalyzer": ".bazel_analyzer",
+    "MesonAnalyzer": ".meson_analyzer",
+    "GCCAnalyzer": ".gcc_analyzer",
+    "ClangAnalyzer": ".clang_analyzer",
+    "MSVCAnalyzer": ".msvc_analyzer",
+    "ICCAnalyzer": ".icc_analyzer",
+}
 
-# Compiler analyzers (exported for completeness)
-from .gcc_analyzer import GCCAnalyzer
-from .clang_analyzer import ClangAnalyzer
-from .msvc_analyzer import MSVCAnalyzer
-from .icc_analyzer import ICCAnalyzer
+
+def __getattr__(name: str):
+    module_name = _ANALYZER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(module_name, __name__)
+    cls = getattr(module, name)
+    globals()[name] = cls  # cache so the import runs once
+    return cls
 
 
 __all__ = [
@@ -65,26 +176,78 @@ __all__ = [
     "MSVCAnalyzer",
     "ICCAnalyzer",
     "Analyzer",
+    "Suggestion",
+    "build_file_index",
     "get_build_analyzer",
 ]
 
 
-# Mapping from BuildSystem enum to analyzer class
+# Mapping from BuildSystem enum to analyzer class name (resolved lazily)
 _BUILD_ANALYZER_MAP = {
-    enums.BuildSystem.CMAKE: CMakeAnalyzer,
-    enums.BuildSystem.QMAKE: QMakeAnalyzer,
-    enums.BuildSystem.NINJA: NinjaAnalyzer,
-    enums.BuildSystem.MSBUILD: MSBuildAnalyzer,
-    enums.BuildSystem.MAKE: MakeAnalyzer,
-    enums.BuildSystem.BAZEL: BazelAnalyzer,
-    enums.BuildSystem.MESON: MesonAnalyzer,
+    enums.BuildSystem.CMAKE: "CMakeAnalyzer",
+    enums.BuildSystem.QMAKE: "QMakeAnalyzer",
+    enums.BuildSystem.NINJA: "NinjaAnalyzer",
+    enums.BuildSystem.MSBUILD: "MSBuildAnalyzer",
+    enums.BuildSystem.MAKE: "MakeAnalyzer",
+    enums.BuildSystem.BAZEL: "BazelAnalyzer",
+    enums.BuildSystem.MESON: "MesonAnalyzer",
 }
 
 
-def _detect_build_system_from_files(project_path: Optional[str]) -> Optional[enums.BuildSystem]:
+def _load_analyzer(build_system: enums.BuildSystem) -> Optional[Type[Analyzer]]:
+    """Resolve a BuildSystem to its analyzer class, importing on demand."""
+    class_name = _BUILD_ANALYZER_MAP.get(build_system)
+    if class_name is None:
+        return None
+    return __getattr__(class_name)
+
+
+# Marker files/suffixes for build-system detection, and the priority
+# order the old per-system globs implied (first match in this order wins)
+_MARKER_PRIORITY = (
+    enums.BuildSystem.CMAKE,
+    enums.BuildSystem.QMAKE,
+    enums.BuildSystem.BAZEL,
+    enums.BuildSystem.MESON,
+    enums.BuildSystem.MAKE,
+    enums.BuildSystem.NINJA,
+    enums.BuildSystem.MSBUILD,
+)
+_NAME_MARKERS = {
+    "CMakeLists.txt": enums.BuildSystem.CMAKE,
+    "BUILD": enums.BuildSystem.BAZEL,
+    "BUILD.bazel": enums.BuildSystem.BAZEL,
+    "WORKSPACE": enums.BuildSystem.BAZEL,
+    "meson.build": enums.BuildSystem.MESON,
+    "Makefile": enums.BuildSystem.MAKE,
+    "build.ninja": enums.BuildSystem.NINJA,
+}
+# autoconf / scons projects build through make, but these are heuristics
+# the old detection only reached after every real marker had missed, so
+# they must not outrank ninja or MSBuild markers in the priority list
+_FALLBACK_NAME_MARKERS = {
+    "configure.ac": enums.BuildSystem.MAKE,
+    "configure": enums.BuildSystem.MAKE,
+    "SConstruct": enums.BuildSystem.MAKE,
+}
+_SUFFIX_MARKERS = {
+    ".pro": enums.BuildSystem.QMAKE,
+    ".sln": enums.BuildSystem.MSBUILD,
+    ".vcxproj": enums.BuildSystem.MSBUILD,
+}
+
+
+def _detect_build_system_from_files(
+    project_path: Optional[str],
+    _visited: Optional[set] = None,
+) -> Optional[enums.BuildSystem]:
     """Try to detect the build system by presence of typical files.
 
-    Returns a `config.enums.BuildSystem` or None if unknown.
+    Returns a `config.enums.BuildSystem` or None if unknown. One walk
+    classifies every filename against the marker tables instead of one
+    full glob per candidate system; the walk short-circuits as soon as
+    the highest-priority marker (CMakeLists.txt) shows up, which the
+    top level of most CMake trees satisfies immediately.
     """
     if not project_path:
         return None
@@ -92,44 +255,51 @@ def _detect_build_system_from_files(project_path: Optional[str]) -> Optional[enu
     if not p.exists():
         return None
 
-    # Common detection heuristics
-    # Check top-level and recursive files
-    if (p / "CMakeLists.txt").exists() or any(p.glob("**/CMakeLists.txt")):
-        return enums.BuildSystem.CMAKE
-    if any(p.glob("**/*.pro")):
-        return enums.BuildSystem.QMAKE
-    if (p / "BUILD").exists() or (p / "WORKSPACE").exists() or any(p.glob("**/BUILD")):
-        return enums.BuildSystem.BAZEL
-    if (p / "meson.build").exists() or any(p.glob("**/meson.build")):
-        return enums.BuildSystem.MESON
-    if (p / "Makefile").exists() or any(p.glob("**/Makefile")):
-        return enums.BuildSystem.MAKE
-    if (p / "build.ninja").exists() or any(p.glob("**/build.ninja")):
-        return enums.BuildSystem.NINJA
-    if any(p.glob("**/*.sln")) or any(p.glob("**/*.vcxproj")):
-        return enums.BuildSystem.MSBUILD
-
-    # Additional heuristics: autoconf, scons
-    if (p / "configure.ac").exists() or any(p.glob("**/configure.ac")) or (p / "configure").exists():
-        return enums.BuildSystem.MAKE
-    if (p / "SConstruct").exists() or any(p.glob("**/SConstruct")):
-        return enums.BuildSystem.MAKE
+    # Shared submodules can appear under several parents; scan each once
+    if _visited is None:
+        _visited = set()
+    resolved = p.resolve()
+    if resolved in _visited:
+        return None
+    _visited.add(resolved)
+
+    found = set()
+    fallback = None
+    for dirpath, dirnames, filenames in os.walk(p, followlinks=False):
+        dirnames[:] = [d for d in dirnames if d not in _INDEX_SKIP_DIRS]
+        for name in filenames:
+            marker = _NAME_MARKERS.get(name)
+            if marker is None:
+                marker = _SUFFIX_MARKERS.get(os.path.splitext(name)[1])
+            if marker is not None:
+                if marker is _MARKER_PRIORITY[0]:
+                    return marker
+                found.add(marker)
+            elif fallback is None:
+                fallback = _FALLBACK_NAME_MARKERS.get(name)
+    for build_system in _MARKER_PRIORITY:
+        if build_system in found:
+            return build_system
+    if fallback is not None:
+        return fallback
 
     # Check .gitmodules and examine submodule paths if present
     gitmodules = p / ".gitmodules"
     if gitmodules.exists():
         try:
-            content = gitmodules.read_text(encoding="utf-8", errors="ignore")
-            # simple parse for path = entries
-            for line in content.splitlines():
-                line = line.strip()
-                if line.startswith("path ="):
-                    subpath = line.split("=", 1)[1].strip()
-                    candidate = p / subpath
-                    if candidate.exists():
-                        detected = _detect_build_system_from_files(str(candidate))
-                        if detected:
-                            return detected
+            cp = configparser.ConfigParser()
+            cp.read(gitmodules, encoding="utf-8")
+            for section in cp.sections():
+                subpath = cp[section].get("path")
+                if not subpath:
+                    continue
+                candidate = p / subpath
+                if candidate.exists():
+                    detected = _detect_build_system_from_files(
+                        str(candidate), _visited
+                    )
+                    if detected:
+                        return detected
         except Exception:
             pass
 
@@ -145,14 +315,14 @@ def get_build_analyzer(project_path: Optional[str] = None, build_system: Optiona
     """
     # If user provided explicit build system, prefer it
     if build_system is not None:
-        analyzer = _BUILD_ANALYZER_MAP.get(build_system)
+        analyzer = _load_analyzer(build_system)
         if analyzer:
             return analyzer
 
     # Fallback to automatic detection
     detected = _detect_build_system_from_files(project_path)
     if detected is not None:
-        return _BUILD_ANALYZER_MAP.get(detected)
+        return _load_analyzer(detected)
 
     # Nothing detected
     return None
@@ -0,0 +1,133 @@
+"""Low-level token scanning shared by the build and compiler analyzers."""
+
+import mmap
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Tuple
+
+# Directory names that never hold hand-written build files; pruned before
+# descending so the walk never pays for .git objects or build output
+_SKIP_DIRS = frozenset(
+    {
+        '.git', 'build', 'out', '_deps', '.cache',
+        'node_modules', 'third_party', 'vendor', '__pycache__',
+    }
+)
+
+# Token probes look for short flags that realistically sit in hand-written
+# build files; multi-megabyte generated files (CMakeCache.txt, docs .txt)
+# are skipped past this size unless they are CMake scripts, where flag
+# definitions legitimately appear at any size.
+_MAX_SCAN_BYTES = 512 * 1024
+
+
+def _exempt_from_size_gate(name: str) -> bool:
+    return name == 'CMakeLists.txt' or name.endswith('.cmake')
+
+
+def iter_files(root, names=(), suffixes=(), skip_dirs=_SKIP_DIRS):
+    """Yield files under `root` matching exact `names` or `suffixes`.
+
+    A single os.scandir walk with pruning replaces Path.rglob, which
+    descends into VCS and build-output trees that dominate inode counts
+    on real projects. cmake-build-* directories are pruned by prefix.
+    """
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if (
+                            entry.name not in skip_dirs
+                            and not entry.name.startswith('cmake-build-')
+                        ):
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and (
+                        entry.name in names
+                        or os.path.splitext(entry.name)[1] in suffixes
+                    ):
+                        yield Path(entry.path)
+                except OSError:
+                    continue
+
+
+def contains_any(path, needles: Tuple[bytes, ...]) -> bool:
+    """Return True if the file at `path` contains any of the byte needles.
+
+    Searches the raw bytes through mmap, so multi-megabyte generated build
+    files (CMakeCache.txt, build.ninja, ...) are never decoded to str or
+    copied into Python memory. Unreadable or empty files count as a miss.
+    """
+    try:
+        with open(path, 'rb') as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if size == 0:
+                return False
+            if size > _MAX_SCAN_BYTES and not _exempt_from_size_gate(
+                os.path.basename(str(path))
+            ):
+                return False
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return any(mm.find(needle) != -1 for needle in needles)
+    except (OSError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def _token_scanner(needles: Tuple[bytes, ...]):
+    """Compile (and cache) one alternation scanner for a token set."""
+    return re.compile(b"|".join(re.escape(n) for n in needles))
+
+
+def match_tokens(path, needles: Tuple[bytes, ...]) -> FrozenSet[bytes]:
+    """Return the subset of `needles` that occur in the file at `path`.
+
+    Analyzers that probe several tokens per file previously paid one
+    full scan per token. A single cached alternation pattern finds all
+    of them in one O(filesize) pass over the mapped bytes, stopping
+    early once every token has been seen.
+    """
+    pattern = _token_scanner(tuple(needles))
+    found = set()
+    try:
+        with open(path, 'rb') as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if size == 0:
+                return frozenset()
+            if size > _MAX_SCAN_BYTES and not _exempt_from_size_gate(
+                os.path.basename(str(path))
+            ):
+                return frozenset()
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for match in pattern.finditer(mm):
+                    found.add(match.group(0))
+                    if len(found) == len(needles):
+                        break
+    except (OSError, ValueError):
+        return frozenset()
+    return frozenset(found)
+
+
+def scan_files(paths, scan_fn, parallel: bool = True):
+    """Apply `scan_fn` to every path, overlapping the file I/O with threads.
+
+    The per-file scans are independent reads with no shared state, so a
+    thread pool overlaps page-cache/syscall latency across cores. Results
+    keep the order of `paths`. Falls back to a plain loop for tiny batches
+    or when `parallel` is False.
+    """
+    paths = list(paths)
+    if not parallel or len(paths) < 2:
+        return [scan_fn(p) for p in paths]
+    workers = min(len(paths), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(scan_fn, paths))
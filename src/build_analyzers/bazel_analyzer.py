@@ -1,30 +1,36 @@
 from pathlib import Path
-from typing import Dict, Any
-from build_analyzers import Analyzer
+from typing import Dict, Any, List, Optional
+from build_analyzers import Analyzer, Suggestion
+from build_analyzers._scan import iter_files, match_tokens, scan_files
+
+_BAZEL_TOKENS = (b'cc_library', b'pch')
+
+
+def _scan_build_file(bf: Path) -> List[Suggestion]:
+    suggestions = []
+    found = match_tokens(bf, _BAZEL_TOKENS)
+
+    if b'cc_library' in found and b'pch' not in found:
+        suggestions.append(Suggestion(
+            type='BAZEL_PCH',
+            file=str(bf),
+            message='Bazel BUILD contains cc_library targets. Consider adding settings or macros to enable precompiled headers or thin LTO where appropriate.'
+        ))
+
+    return suggestions
 
 
 class BazelAnalyzer(Analyzer):
     """Analyze Bazel BUILD files for optimizations and suggestions."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
-        build_files = list(root.rglob('BUILD')) + list(root.rglob('BUILD.bazel'))
-        suggestions = []
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        build_files = list(iter_files(project_path, names=('BUILD', 'BUILD.bazel')))
 
         if not build_files:
             return {"found": False, "files": [], "suggestions": []}
 
-        for bf in build_files:
-            try:
-                text = bf.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                text = ''
-
-            if 'cc_library' in text and 'pch' not in text:
-                suggestions.append({
-                    'type': 'BAZEL_PCH',
-                    'file': str(bf),
-                    'message': 'Bazel BUILD contains cc_library targets. Consider adding settings or macros to enable precompiled headers or thin LTO where appropriate.'
-                })
+        suggestions = [
+            s for per_file in scan_files(build_files, _scan_build_file) for s in per_file
+        ]
 
         return {"found": True, "files": [str(p) for p in build_files], "suggestions": suggestions}
@@ -1,28 +1,30 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import (
+    _FLAG_FILE_SUFFIXES,
+    Analyzer,
+    Suggestion,
+    build_file_index,
+    scan_compiler_flags,
+)
 
 
 class ClangAnalyzer(Analyzer):
     """Analyze project files for Clang specific flags and suggestions."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        if file_index is None:
+            file_index = build_file_index(project_path)
         suggestions = []
 
-        for f in root.rglob('*'):
-            if f.suffix in {'.cmake', '.mk', '.make', '.pro', '.txt'}:
-                try:
-                    text = f.read_text(encoding='utf-8', errors='ignore')
-                except Exception:
-                    continue
-
-                if '-flto' not in text and '-flto=thin' not in text:
-                    suggestions.append({
-                        'type': 'CLANG_LTO',
-                        'file': str(f),
-                        'message': 'Clang LTO flags not detected. Consider enabling -flto or -flto=thin for link-time optimizations.'
-                    })
+        # One shared flag scan covers GCC, Clang and ICC tokens together
+        has_candidates = any(file_index.get(s) for s in _FLAG_FILE_SUFFIXES)
+        if has_candidates and b'-flto' not in scan_compiler_flags(file_index):
+            suggestions.append(Suggestion(
+                type='CLANG_LTO',
+                file=str(project_path),
+                message='Clang LTO flags not detected. Consider enabling -flto or -flto=thin for link-time optimizations.'
+            ))
 
         return {"found": True, "files": [], "suggestions": suggestions}
@@ -1,41 +1,46 @@
-import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import Analyzer, Suggestion
+from build_analyzers._scan import iter_files, match_tokens, scan_files
+
+_CMAKE_TOKENS = (b'precompile', b'CMAKE_BUILD_PARALLEL_LEVEL', b'cmake --build')
+
+
+def _scan_cmake_file(cf: Path) -> List[Suggestion]:
+    suggestions = []
+    found = match_tokens(cf, _CMAKE_TOKENS)
+
+    # Check for PCH usage
+    if b'precompile' not in found:
+        suggestions.append(Suggestion(
+            type='CMAKE_PCH',
+            file=str(cf),
+            message='CMake project does not appear to use precompiled headers. Consider using target_precompile_headers to reduce compile times.'
+        ))
+
+    # Check for parallel build hints
+    if b'CMAKE_BUILD_PARALLEL_LEVEL' not in found and b'cmake --build' not in found:
+        suggestions.append(Suggestion(
+            type='CMAKE_PARALLEL',
+            file=str(cf),
+            message='No explicit parallel build configuration detected. Consider setting CMAKE_BUILD_PARALLEL_LEVEL or documenting parallel build instructions.'
+        ))
+
+    return suggestions
 
 
 class CMakeAnalyzer(Analyzer):
     """Analyze CMake-specific files (CMakeLists.txt) and provide suggestions."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
-        cmake_files = list(root.rglob('CMakeLists.txt'))
-        suggestions = []
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        cmake_files = list(iter_files(project_path, names=('CMakeLists.txt',)))
 
         if not cmake_files:
             return {"found": False, "files": [], "suggestions": []}
 
-        for cf in cmake_files:
-            try:
-                text = cf.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                text = ''
-
-            # Check for PCH usage
-            if 'target_precompile_headers' not in text and 'precompile' not in text:
-                suggestions.append({
-                    'type': 'CMAKE_PCH',
-                    'file': str(cf),
-                    'message': 'CMake project does not appear to use precompiled headers. Consider using target_precompile_headers to reduce compile times.'
-                })
-
-            # Check for parallel build hints
-            if 'CMAKE_BUILD_PARALLEL_LEVEL' not in text and 'cmake --build' not in text:
-                suggestions.append({
-                    'type': 'CMAKE_PARALLEL',
-                    'file': str(cf),
-                    'message': 'No explicit parallel build configuration detected. Consider setting CMAKE_BUILD_PARALLEL_LEVEL or documenting parallel build instructions.'
-                })
+        suggestions = [
+            s for per_file in scan_files(cmake_files, _scan_cmake_file) for s in per_file
+        ]
 
         return {"found": True, "files": [str(p) for p in cmake_files], "suggestions": suggestions}
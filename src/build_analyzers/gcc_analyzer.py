@@ -1,30 +1,30 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import (
+    _FLAG_FILE_SUFFIXES,
+    Analyzer,
+    Suggestion,
+    build_file_index,
+    scan_compiler_flags,
+)
 
 
 class GCCAnalyzer(Analyzer):
     """Analyze project files for GCC specific flags and suggestions."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
-        files = list(root.rglob('*'))
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        if file_index is None:
+            file_index = build_file_index(project_path)
         suggestions = []
 
-        # Look for common GCC flags in CMake, Makefile, etc.
-        for f in files:
-            if f.suffix in {'.txt', '.cmake', '.mk', '.make', '.pro', '.txt', '.cfg'}:
-                try:
-                    text = f.read_text(encoding='utf-8', errors='ignore')
-                except Exception:
-                    continue
-
-                if '-march=native' not in text:
-                    suggestions.append({
-                        'type': 'GCC_OPT',
-                        'file': str(f),
-                        'message': 'GCC optimization flags like -march=native are not present. Consider adding appropriate optimization flags for release builds.'
-                    })
+        # One shared flag scan covers GCC, Clang and ICC tokens together
+        has_candidates = any(file_index.get(s) for s in _FLAG_FILE_SUFFIXES)
+        if has_candidates and b'-march=native' not in scan_compiler_flags(file_index):
+            suggestions.append(Suggestion(
+                type='GCC_OPT',
+                file=str(project_path),
+                message='GCC optimization flags like -march=native are not present. Consider adding appropriate optimization flags for release builds.'
+            ))
 
         return {"found": True, "files": [], "suggestions": suggestions}
@@ -1,28 +1,32 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import (
+    _FLAG_FILE_SUFFIXES,
+    Analyzer,
+    Suggestion,
+    build_file_index,
+    scan_compiler_flags,
+)
 
 
 class ICCAnalyzer(Analyzer):
     """Analyze for Intel ICC compiler specific suggestions."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        if file_index is None:
+            file_index = build_file_index(project_path)
         suggestions = []
 
-        for f in root.rglob('*'):
-            if f.suffix in {'.cmake', '.mk', '.make', '.pro', '.txt'}:
-                try:
-                    text = f.read_text(encoding='utf-8', errors='ignore')
-                except Exception:
-                    continue
-
-                if '-ipo' not in text and '-xHost' not in text:
-                    suggestions.append({
-                        'type': 'ICC_OPTS',
-                        'file': str(f),
-                        'message': 'Intel ICC optimization flags like -ipo or -xHost not detected. Consider enabling compiler-specific flags for performance.'
-                    })
+        # One shared flag scan covers GCC, Clang and ICC tokens together
+        has_candidates = any(file_index.get(s) for s in _FLAG_FILE_SUFFIXES)
+        if has_candidates and scan_compiler_flags(file_index).isdisjoint(
+            (b'-ipo', b'-xHost')
+        ):
+            suggestions.append(Suggestion(
+                type='ICC_OPTS',
+                file=str(project_path),
+                message='Intel ICC optimization flags like -ipo or -xHost not detected. Consider enabling compiler-specific flags for performance.'
+            ))
 
         return {"found": True, "files": [], "suggestions": suggestions}
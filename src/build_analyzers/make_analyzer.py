@@ -1,38 +1,45 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import Analyzer, Suggestion
+from build_analyzers._scan import iter_files, match_tokens, scan_files
+
+_PCH_TOKENS = (b'PCH_HEADER', b'precompiled', b'Precompiled', b'PRECOMPILED')
+_PARALLEL_TOKENS = (b'$(MAKE) -j', b'nproc')
+
+
+def _scan_makefile(mf: Path) -> List[Suggestion]:
+    suggestions = []
+    found = match_tokens(mf, _PCH_TOKENS + _PARALLEL_TOKENS)
+
+    if not found & set(_PCH_TOKENS):
+        suggestions.append(Suggestion(
+            type='MAKE_PCH',
+            file=str(mf),
+            message='Makefile does not show precompiled header rules. Consider adding a rule to generate and use PCH to speed up builds.'
+        ))
+
+    if not found & set(_PARALLEL_TOKENS):
+        suggestions.append(Suggestion(
+            type='MAKE_PARALLEL',
+            file=str(mf),
+            message='Makefile lacks explicit parallel invocation guidance. Consider documenting make -j$(nproc) or adding a JOBS variable.'
+        ))
+
+    return suggestions
 
 
 class MakeAnalyzer(Analyzer):
     """Analyze Makefiles for parallel build and PCH hints."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
-        makefiles = list(root.rglob('Makefile')) + list(root.rglob('makefile'))
-        suggestions = []
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        makefiles = list(iter_files(project_path, names=('Makefile', 'makefile')))
 
         if not makefiles:
             return {"found": False, "files": [], "suggestions": []}
 
-        for mf in makefiles:
-            try:
-                text = mf.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                text = ''
-
-            if 'PCH_HEADER' not in text and 'precompiled' not in text.lower():
-                suggestions.append({
-                    'type': 'MAKE_PCH',
-                    'file': str(mf),
-                    'message': 'Makefile does not show precompiled header rules. Consider adding a rule to generate and use PCH to speed up builds.'
-                })
-
-            if '$(MAKE) -j' not in text and 'nproc' not in text:
-                suggestions.append({
-                    'type': 'MAKE_PARALLEL',
-                    'file': str(mf),
-                    'message': 'Makefile lacks explicit parallel invocation guidance. Consider documenting make -j$(nproc) or adding a JOBS variable.'
-                })
+        suggestions = [
+            s for per_file in scan_files(makefiles, _scan_makefile) for s in per_file
+        ]
 
         return {"found": True, "files": [str(p) for p in makefiles], "suggestions": suggestions}
@@ -1,31 +1,29 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import Analyzer, Suggestion, build_file_index, _project_has_token
 
 
 class MesonAnalyzer(Analyzer):
     """Analyze meson.build files and provide suggestions."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
-        meson_files = list(root.rglob('meson.build'))
-        suggestions = []
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        if file_index is None:
+            file_index = build_file_index(project_path)
+        meson_files = [
+            f for f in file_index.get('.build', ()) if f.name == 'meson.build'
+        ]
 
         if not meson_files:
             return {"found": False, "files": [], "suggestions": []}
 
-        for mf in meson_files:
-            try:
-                text = mf.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                text = ''
-
-            if "b_lto" not in text and "lto" not in text:
-                suggestions.append({
-                    'type': 'MESON_LTO',
-                    'file': str(mf),
-                    'message': 'Meson build files do not enable LTO. Consider adding b_lto=true for release builds to improve performance.'
-                })
+        suggestions = []
+        # LTO advice is project-global: stop at the first file enabling it
+        if not _project_has_token({'.build': meson_files}, ('.build',), (b'lto',)):
+            suggestions.append(Suggestion(
+                type='MESON_LTO',
+                file=str(project_path),
+                message='Meson build files do not enable LTO. Consider adding b_lto=true for release builds to improve performance.'
+            ))
 
         return {"found": True, "files": [str(p) for p in meson_files], "suggestions": suggestions}
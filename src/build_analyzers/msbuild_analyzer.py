@@ -1,31 +1,37 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import Analyzer, Suggestion
+from build_analyzers._scan import iter_files, match_tokens, scan_files
+
+_MSBUILD_TOKENS = (b'<ClCompile', b'PrecompiledHeader')
+
+
+def _scan_project_file(pf: Path) -> List[Suggestion]:
+    suggestions = []
+    found = match_tokens(pf, _MSBUILD_TOKENS)
+
+    if b'<ClCompile' in found and b'PrecompiledHeader' not in found:
+        suggestions.append(Suggestion(
+            type='MSBUILD_PCH',
+            file=str(pf),
+            message='Project has C++ compile items but no PrecompiledHeader setting detected. Consider enabling PCH in MSBuild projects.'
+        ))
+
+    return suggestions
 
 
 class MSBuildAnalyzer(Analyzer):
     """Analyze MSBuild project files (.vcxproj, .sln) and give suggestions."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
-        proj_files = list(root.rglob('*.vcxproj')) + list(root.rglob('*.sln'))
-        suggestions = []
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        proj_files = list(iter_files(project_path, suffixes=('.vcxproj', '.sln')))
 
         if not proj_files:
             return {"found": False, "files": [], "suggestions": []}
 
-        for pf in proj_files:
-            try:
-                text = pf.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                text = ''
-
-            if '<ClCompile' in text and 'PrecompiledHeader' not in text:
-                suggestions.append({
-                    'type': 'MSBUILD_PCH',
-                    'file': str(pf),
-                    'message': 'Project has C++ compile items but no PrecompiledHeader setting detected. Consider enabling PCH in MSBuild projects.'
-                })
+        suggestions = [
+            s for per_file in scan_files(proj_files, _scan_project_file) for s in per_file
+        ]
 
         return {"found": True, "files": [str(p) for p in proj_files], "suggestions": suggestions}
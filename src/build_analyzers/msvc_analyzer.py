@@ -1,27 +1,25 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import Analyzer, Suggestion, build_file_index, _project_has_token
 
 
 class MSVCAnalyzer(Analyzer):
     """Analyze MSVC project files for MSVC-specific optimizations."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        if file_index is None:
+            file_index = build_file_index(project_path)
         suggestions = []
 
-        for f in root.rglob('*.vcxproj'):
-            try:
-                text = f.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                continue
-
-            if '/GL' not in text and 'LTCG' not in text:
-                suggestions.append({
-                    'type': 'MSVC_LTO',
-                    'file': str(f),
-                    'message': 'MSVC whole program optimization (/GL) or LTCG not detected. Consider enabling these for release builds.'
-                })
+        # Project-global advice: one suggestion, first hit wins
+        if file_index.get('.vcxproj') and not _project_has_token(
+            file_index, ('.vcxproj',), (b'/GL', b'LTCG')
+        ):
+            suggestions.append(Suggestion(
+                type='MSVC_LTO',
+                file=str(project_path),
+                message='MSVC whole program optimization (/GL) or LTCG not detected. Consider enabling these for release builds.'
+            ))
 
         return {"found": True, "files": [], "suggestions": suggestions}
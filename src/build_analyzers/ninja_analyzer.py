@@ -1,32 +1,35 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import Analyzer, Suggestion
+from build_analyzers._scan import contains_any, iter_files, scan_files
+
+
+def _scan_ninja_file(nf: Path) -> List[Suggestion]:
+    suggestions = []
+
+    # Check for pool or jobs
+    if not contains_any(nf, (b'pool',)):
+        suggestions.append(Suggestion(
+            type='NINJA_POOL',
+            file=str(nf),
+            message='No explicit ninja pools found. Consider using pools for expensive steps to limit concurrency.'
+        ))
+
+    return suggestions
 
 
 class NinjaAnalyzer(Analyzer):
     """Analyze Ninja build files (build.ninja) for common optimizations."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
-        ninja_files = list(root.rglob('build.ninja'))
-        suggestions = []
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        ninja_files = list(iter_files(project_path, names=('build.ninja',)))
 
         if not ninja_files:
             return {"found": False, "files": [], "suggestions": []}
 
-        for nf in ninja_files:
-            try:
-                text = nf.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                text = ''
-
-            # Check for pool or jobs
-            if 'pool' not in text:
-                suggestions.append({
-                    'type': 'NINJA_POOL',
-                    'file': str(nf),
-                    'message': 'No explicit ninja pools found. Consider using pools for expensive steps to limit concurrency.'
-                })
+        suggestions = [
+            s for per_file in scan_files(ninja_files, _scan_ninja_file) for s in per_file
+        ]
 
         return {"found": True, "files": [str(p) for p in ninja_files], "suggestions": suggestions}
@@ -1,40 +1,47 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from build_analyzers import Analyzer
+from build_analyzers import Analyzer, Suggestion
+from build_analyzers._scan import iter_files, match_tokens, scan_files
+
+_CONFIG_TOKENS = (b'CONFIG +=', b'CONFIG+=')
+_QT_TOKENS = (b'QT +=', b'QT+=')
+
+
+def _scan_pro_file(pf: Path) -> List[Suggestion]:
+    suggestions = []
+    found = match_tokens(pf, _CONFIG_TOKENS + _QT_TOKENS)
+
+    # Check for CONFIG entries
+    if not found & set(_CONFIG_TOKENS):
+        suggestions.append(Suggestion(
+            type='QMAKE_CONFIG',
+            file=str(pf),
+            message='QMake .pro file has no CONFIG flags. Consider enabling precompiled headers or optimization flags via CONFIG +='
+        ))
+
+    # Check for QT modules
+    if found & set(_QT_TOKENS):
+        suggestions.append(Suggestion(
+            type='QMAKE_QT_MODULES',
+            file=str(pf),
+            message='Qt modules declared; ensure only needed modules are included to reduce compile and link time.'
+        ))
+
+    return suggestions
 
 
 class QMakeAnalyzer(Analyzer):
     """Analyze Qt QMake .pro files and provide targeted suggestions."""
 
-    def analyze(self, project_path: str) -> Dict[str, Any]:
-        root = Path(project_path)
-        pro_files = list(root.rglob('*.pro'))
-        suggestions = []
+    def analyze(self, project_path: str, file_index: Optional[Dict[str, List[Path]]] = None) -> Dict[str, Any]:
+        pro_files = list(iter_files(project_path, suffixes=('.pro',)))
 
         if not pro_files:
             return {"found": False, "files": [], "suggestions": []}
 
-        for pf in pro_files:
-            try:
-                text = pf.read_text(encoding='utf-8', errors='ignore')
-            except Exception:
-                text = ''
-
-            # Check for CONFIG entries
-            if 'CONFIG +=' not in text and 'CONFIG+=' not in text:
-                suggestions.append({
-                    'type': 'QMAKE_CONFIG',
-                    'file': str(pf),
-                    'message': 'QMake .pro file has no CONFIG flags. Consider enabling precompiled headers or optimization flags via CONFIG +='
-                })
-
-            # Check for QT modules
-            if 'QT +=' in text or 'QT+=' in text:
-                suggestions.append({
-                    'type': 'QMAKE_QT_MODULES',
-                    'file': str(pf),
-                    'message': 'Qt modules declared; ensure only needed modules are included to reduce compile and link time.'
-                })
+        suggestions = [
+            s for per_file in scan_files(pro_files, _scan_pro_file) for s in per_file
+        ]
 
         return {"found": True, "files": [str(p) for p in pro_files], "suggestions": suggestions}
@@ -1,41 +1,96 @@
+import sys
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Tuple
+
 from config.enums import Compiler
 
+# 跨编译器复用的标志先驻留为单例字符串：各档案的元组共享同一对象，
+# 下游的标志比较可以走指针相等的快路径
+_O2, _G, _O0, _MARCH_NATIVE, _GL = map(
+    sys.intern, ("-O2", "-g", "-O0", "-march=native", "/GL")
+)
+_X, _CXX_HEADER, _STDAFX, _PCH_EXT = map(
+    sys.intern, ("-x", "c++-header", "stdafx.h", ".pch")
+)
+
+# dataclass(slots=True) 需要3.10+，CI仍覆盖3.8/3.9：低版本退回普通
+# （带__dict__）布局，行为不变，只是每实例多一个字典
+_SLOTS_KW = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS_KW)
+class CompilerProfile:
+    """Immutable per-compiler build settings.
+
+    Flag lists are tuples so lookups hand out shared immutable data
+    instead of copyable lists; `opt_str` is the optimization flags
+    pre-joined once at import for template writers.
+    """
+
+    name: str
+    pch_ext: str
+    pch_flags: Tuple[str, ...]
+    std_pch_name: str
+    optimization_flags: Tuple[str, ...]
+    debug_flags: Tuple[str, ...]
+    # PGO 分三阶段：插桩编译 -> 运行采样 -> 按采样重编，生成/使用两组
+    # 标志不能同时出现，所以拆成独立字段；cs_pgo_gen_flags 是 Clang 的
+    # 上下文敏感二阶段插桩，其他编译器为空
+    pgo_gen_flags: Tuple[str, ...]
+    pgo_use_flags: Tuple[str, ...]
+    cs_pgo_gen_flags: Tuple[str, ...] = ()
+    opt_str: str = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "opt_str", " ".join(self.optimization_flags))
+
 
-COMPILER_CONFIGS = {
-    Compiler.GCC: {
-        "name": "GCC",
-        "pch_ext": ".gch",
-        "pch_flags": ["-x", "c++-header"],
-        "std_pch_name": "stdafx.h",
-        "optimization_flags": ["-O2", "-march=native", "-flto"],
-        "debug_flags": ["-g", "-O0"],
-        "pgo_flags": ["-fprofile-generate", "-fprofile-use"],
-    },
-    Compiler.CLANG: {
-        "name": "Clang",
-        "pch_ext": ".pch",
-        "pch_flags": ["-x", "c++-header"],
-        "std_pch_name": "stdafx.h",
-        "optimization_flags": ["-O2", "-march=native", "-flto=thin"],
-        "debug_flags": ["-g", "-O0"],
-        "pgo_flags": ["-fprofile-instr-generate", "-fprofile-instr-use"],
-    },
-    Compiler.MSVC: {
-        "name": "MSVC",
-        "pch_ext": ".pch",
-        "pch_flags": ["/Yc"],
-        "std_pch_name": "stdafx.h",
-        "optimization_flags": ["/O2", "/GL", "/arch:AVX2"],
-        "debug_flags": ["/Zi", "/Od"],
-        "pgo_flags": ["/GL", "/LTCG"],
-    },
-    Compiler.ICC: {
-        "name": "Intel C++ Compiler",
-        "pch_ext": ".pch",
-        "pch_flags": ["-pch-create"],
-        "std_pch_name": "stdafx.h",
-        "optimization_flags": ["-O2", "-xHost", "-ipo"],
-        "debug_flags": ["-g", "-O0"],
-        "pgo_flags": ["-prof-gen", "-prof-use"],
-    },
-}
+COMPILER_CONFIGS = MappingProxyType({
+    Compiler.GCC: CompilerProfile(
+        name="GCC",
+        pch_ext=".gch",
+        pch_flags=(_X, _CXX_HEADER),
+        std_pch_name=_STDAFX,
+        # -ffat-lto-objects 让LTO构建仍产出可直接使用的.o；
+        # -fuse-linker-plugin 让链接器看到完整中间表示
+        optimization_flags=(
+            _O2, _MARCH_NATIVE, "-flto",
+            "-ffat-lto-objects", "-fuse-linker-plugin",
+        ),
+        debug_flags=(_G, _O0),
+        pgo_gen_flags=("-fprofile-generate=./pgo-data",),
+        pgo_use_flags=("-fprofile-use=./pgo-data", "-fprofile-correction"),
+    ),
+    Compiler.CLANG: CompilerProfile(
+        name="Clang",
+        pch_ext=_PCH_EXT,
+        pch_flags=(_X, _CXX_HEADER),
+        std_pch_name=_STDAFX,
+        optimization_flags=(_O2, _MARCH_NATIVE, "-flto=thin"),
+        debug_flags=(_G, _O0),
+        pgo_gen_flags=("-fprofile-instr-generate",),
+        pgo_use_flags=("-fprofile-instr-use",),
+        cs_pgo_gen_flags=("-fcs-profile-generate",),
+    ),
+    Compiler.MSVC: CompilerProfile(
+        name="MSVC",
+        pch_ext=_PCH_EXT,
+        pch_flags=("/Yc",),
+        std_pch_name=_STDAFX,
+        optimization_flags=("/O2", _GL, "/arch:AVX2"),
+        debug_flags=("/Zi", "/Od"),
+        pgo_gen_flags=(_GL, "/LTCG:PGINSTRUMENT"),
+        pgo_use_flags=(_GL, "/LTCG:PGOPTIMIZE"),
+    ),
+    Compiler.ICC: CompilerProfile(
+        name="Intel C++ Compiler",
+        pch_ext=_PCH_EXT,
+        pch_flags=("-pch-create",),
+        std_pch_name=_STDAFX,
+        optimization_flags=(_O2, "-xHost", "-ipo"),
+        debug_flags=(_G, _O0),
+        pgo_gen_flags=("-prof-gen",),
+        pgo_use_flags=("-prof-use",),
+    ),
+})
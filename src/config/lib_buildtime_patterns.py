@@ -1,5 +1,7 @@
 """常见系统头文件行数估算映射"""
 
+import re
+
 # 这些估算值基于典型的C++标准库实现，实际行数可能因实现而异。
 # 所有映射均以头文件名为键，估算的行数为值。
 
@@ -106,3 +108,32 @@ EXTERNAL_LIB = {
     "tensorflow/": 15000,  # TensorFlow
     "torch/": 12000,  # PyTorch
 }
+
+# 导入时把所有外部库模式编译为单个选择正则：每条包含行只做一次C层扫描，
+# 代替对每个模式逐个做Python层子串探测
+_EXTERNAL_LIB_RE = re.compile("|".join(re.escape(p) for p in EXTERNAL_LIB))
+
+
+def match_external(header: str):
+    """返回头文件命中的外部库模式，未命中返回None"""
+    m = _EXTERNAL_LIB_RE.search(header)
+    return m.group(0) if m else None
+
+
+def lookup(header: str) -> int:
+    """返回头文件的估算行数：先查精确表，再做一次外部库模式扫描，未匹配返回0
+
+    扫描器记录的系统头文件名不带尖括号（"vector"），而 SYSTEM_HEADER
+    以带括号形式为键（"<vector>"），两种写法都能命中。
+    """
+    lines = SYSTEM_HEADER.get(header, 0)
+    if lines:
+        return lines
+    if not header.startswith("<"):
+        lines = SYSTEM_HEADER.get(f"<{header}>", 0)
+        if lines:
+            return lines
+    pattern = match_external(header)
+    if pattern is not None:
+        return EXTERNAL_LIB[pattern]
+    return 0
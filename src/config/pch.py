@@ -1,4 +1,4 @@
-PCH_SPECIAL_OPT = f"""
+PCH_SPECIAL_OPT = """
 // 编译器特定优化
 #if defined(__GNUC__) || defined(__clang__)
     #define FORCE_INLINE inline __attribute__((always_inline))
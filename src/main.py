@@ -7,14 +7,181 @@ C++项目编译优化分析器 - 增强优化版
 
 import os
 import argparse
+import hashlib
+import logging
 import sys
-from config import *
-from CppProjectAnalyzer import CppProjectAnalyzer
+from pathlib import Path
 
+from config import AnalysisConfig, OptimizationConfig
+from config.enums import BuildSystem, Compiler
 
-def create_optimization_pipeline(analyzer: CppProjectAnalyzer) -> bool:
+# 单一handler、预编译格式串：进度输出经由logging缓冲，而不是逐条print
+logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+log = logging.getLogger("cpp_turbo_compile")
+
+# argparse.BooleanOptionalAction 3.9 才加入，CI 仍测 3.8：缺失时退回
+# 一个行为一致的最小实现（一次声明同时注册 --X/--no-X）
+if hasattr(argparse, "BooleanOptionalAction"):
+    _BooleanOptionalAction = argparse.BooleanOptionalAction
+else:
+    class _BooleanOptionalAction(argparse.Action):
+        def __init__(
+            self, option_strings, dest, default=None, required=False, help=None
+        ):
+            all_options = []
+            for option in option_strings:
+                all_options.append(option)
+                if option.startswith("--"):
+                    all_options.append("--no-" + option[2:])
+            super().__init__(
+                all_options,
+                dest,
+                nargs=0,
+                default=default,
+                required=required,
+                help=help,
+            )
+
+        def __call__(self, parser, namespace, values, option_string=None):
+            if option_string in self.option_strings:
+                setattr(
+                    namespace, self.dest, not option_string.startswith("--no-")
+                )
+
+        def format_usage(self):
+            return " | ".join(self.option_strings)
+
+
+# CLI 可选值与 值->枚举成员 映射在导入时物化一次，不随每次 main() 调用
+# 重建；choices= 已保证取值合法，直接查字典即可，省去 Enum.__call__ 的
+# _missing_ 协议开销
+_COMPILER_BY_VALUE = {c.value: c for c in Compiler}
+_BUILD_SYSTEM_BY_VALUE = {b.value: b for b in BuildSystem}
+_COMPILER_VALUES = tuple(_COMPILER_BY_VALUE)
+_BUILD_SYSTEM_VALUES = tuple(_BUILD_SYSTEM_BY_VALUE)
+
+
+def _pch_fingerprint(analyzer: "CppProjectAnalyzer", pch_file: Path) -> str:
+    """计算PCH源文本与编译器标志的指纹，内容未变时可跳过重复编译"""
+    profile = analyzer._get_compiler_config()
+    h = hashlib.blake2b(digest_size=16)
+    # 生成时间注释每次都变，剔除后指纹只反映实际内容
+    for line in pch_file.read_bytes().splitlines(keepends=True):
+        if not line.startswith(b"// Generate Time:"):
+            h.update(line)
+    h.update(analyzer.compiler.value.encode("utf-8"))
+    h.update(" ".join(profile.pch_flags).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _pch_fingerprint_path(analyzer: "CppProjectAnalyzer") -> Path:
+    """返回当前项目的指纹缓存文件路径（按项目路径区分）"""
+    key = hashlib.blake2b(
+        str(analyzer.project_path).encode("utf-8"), digest_size=8
+    ).hexdigest()
+    cache_dir = Path(os.path.expanduser("~/.cache/cpp-turbo-compile"))
+    return cache_dir / f"pch-{key}.fingerprint"
+
+
+def _prune_oversized_pch(
+    analyzer: "CppProjectAnalyzer", pch_file: Path, max_bytes: int
+) -> bool:
+    """编译出的PCH超过体积阈值时剔除收益最差的头文件并重新编译
+
+    收益按 估算行数/使用次数 衡量：行数多、用得少的重量级头文件
+    （如 <regex>、tensorflow/）对单个编译单元贡献最小、体积代价最大。
+    返回最终是否留下了一个可用的已编译PCH。
+    """
+    from config import lib_buildtime_patterns
+
+    profile = analyzer._get_compiler_config()
+    pch_output = pch_file.with_suffix(profile.pch_ext)
+    excluded = set()
+
+    while pch_output.exists() and pch_output.stat().st_size > max_bytes:
+        candidates = [
+            (header, count)
+            for header, count in analyzer.header_frequency.most_common(
+                analyzer.analysis_config.pch_max_headers
+            )
+            if header not in excluded
+        ]
+        if not candidates:
+            break
+
+        def _cost(item):
+            header, count = item
+            lines = lib_buildtime_patterns.lookup(header) or 1000
+            return lines / count
+
+        worst = max(candidates, key=_cost)[0]
+        excluded.add(worst)
+        log.info(f"⚠️  PCH体积超过阈值 ({max_bytes // (1024 * 1024)}MB)，剔除 {worst} 后重新编译")
+        analyzer.generate_pch_header(exclude=frozenset(excluded))
+        if not analyzer.compile_pch():
+            # 失败的编译已破坏上一个可用的PCH产物（pch.h里还可能有
+            # PCH_SPECIAL_OPT 依赖被剔除头文件的符号）：撤销本次剔除，
+            # 重新生成并编译以恢复最近一个可编译的版本
+            excluded.discard(worst)
+            log.warning(f"⚠️  剔除 {worst} 后编译失败，撤销剔除并恢复上一个可用PCH")
+            analyzer.generate_pch_header(exclude=frozenset(excluded))
+            return analyzer.compile_pch()
+    return True
+
+
+def _emit_pgo_driver(compiler: Compiler, out_path: Path) -> Path:
+    """生成三阶段PGO驱动脚本：插桩构建 -> 训练负载 -> 按采样重编
+
+    生成/使用两组标志不能出现在同一次构建里，脚本把两次完整构建
+    和中间的数据归并串成一条可直接执行的流水线。
+    """
+    from config.compiler import COMPILER_CONFIGS
+
+    profile = COMPILER_CONFIGS[compiler]
+    gen_flags = " ".join(profile.pgo_gen_flags)
+    use_flags = " ".join(profile.pgo_use_flags)
+    merge_step = ""
+    if compiler is Compiler.CLANG:
+        # Clang的插桩输出是零散的.profraw，须先归并；训练未覆盖的函数
+        # 在重编阶段会告警，显式压掉
+        use_flags = (
+            "-fprofile-instr-use=prof.profdata -Wno-profile-instr-unprofiled"
+        )
+        merge_step = (
+            "\n# 阶段3: 归并采样数据\n"
+            "llvm-profdata merge -output=prof.profdata *.profraw\n"
+        )
+
+    script = f"""#!/usr/bin/env bash
+# 由 Cpp-Turbo-Compile 生成的三阶段PGO流水线 ({profile.name})
+set -euo pipefail
+
+# 阶段1: 插桩构建
+cmake -S . -B build-pgo-gen -DCMAKE_BUILD_TYPE=Release \\
+    -DCMAKE_CXX_FLAGS="{gen_flags}"
+cmake --build build-pgo-gen -j"$(nproc)"
+
+# 阶段2: 运行训练负载（请替换为能代表真实使用场景的工作负载）
+./build-pgo-gen/workload
+{merge_step}
+# 最终阶段: 按采样数据重新构建
+cmake -S . -B build-pgo-use -DCMAKE_BUILD_TYPE=Release \\
+    -DCMAKE_CXX_FLAGS="{use_flags}"
+cmake --build build-pgo-use -j"$(nproc)"
+"""
+    out_path.write_bytes(script.encode("utf-8"))
+    out_path.chmod(0o755)
+    return out_path
+
+
+def create_optimization_pipeline(
+    analyzer: "CppProjectAnalyzer",
+    emit_all: bool = False,
+    pch_fingerprint_cache: bool = False,
+    pch_max_size_mb: int = 64,
+) -> bool:
     """执行优化流水线"""
-    print("🚀 启动优化流水线...")
+    log.info("🚀 启动优化流水线...")
 
     success = True
 
@@ -22,28 +189,80 @@ def create_optimization_pipeline(analyzer: CppProjectAnalyzer) -> bool:
     if analyzer.optimization_config.generate_pch:
         pch_file = analyzer.generate_pch_header()
 
-        # 编译PCH
+        # 编译PCH：启用指纹缓存且内容未变时跳过（哈希不到1ms，编译以秒计）
         if analyzer.optimization_config.compile_pch:
-            success &= analyzer.compile_pch()
+            fingerprint = None
+            fp_file = None
+            if pch_fingerprint_cache:
+                fingerprint = _pch_fingerprint(analyzer, pch_file)
+                fp_file = _pch_fingerprint_path(analyzer)
+
+            # 指纹一致还不够：编译产物可能已被删除或清理，必须仍在盘上
+            pch_output = pch_file.with_suffix(
+                analyzer._get_compiler_config().pch_ext
+            )
+            if (
+                fp_file is not None
+                and fp_file.exists()
+                and fp_file.read_text() == fingerprint
+                and pch_output.exists()
+            ):
+                log.info("⏭️  PCH内容与上次一致，跳过重新编译")
+            else:
+                compiled = analyzer.compile_pch()
+                success &= compiled
+                if compiled and pch_max_size_mb > 0:
+                    success &= _prune_oversized_pch(
+                        analyzer, pch_file, pch_max_size_mb * 1024 * 1024
+                    )
+                if compiled and fp_file is not None:
+                    # 剔除重生成可能改写过pch.h，按最终内容重新取指纹后原子写入
+                    fingerprint = _pch_fingerprint(analyzer, pch_file)
+                    fp_file.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_file = fp_file.with_suffix(".tmp")
+                    tmp_file.write_text(fingerprint)
+                    os.replace(tmp_file, fp_file)
+
+    # 生成PGO驱动脚本：生成/使用标志分属两次独立构建，不能拼进同一条命令
+    if analyzer.optimization_config.enable_pgo:
+        driver = _emit_pgo_driver(
+            analyzer.compiler, analyzer.project_path / "pgo.sh"
+        )
+        log.info(f"💾 PGO三阶段驱动脚本已保存至: {driver}")
 
     # 生成构建配置
     configs = analyzer.generate_build_configurations()
 
-    # 保存主要构建系统的配置
-    main_config = configs.get(analyzer.build_system.value, "")
-    if main_config:
-        config_file = (
-            analyzer.project_path
-            / f"build_optimization_{analyzer.build_system.value}.txt"
-        )
-        with open(config_file, "w") as f:
-            f.write(main_config)
-        print(f"💾 构建配置已保存至: {config_file}")
+    # 保存构建系统配置：默认只写当前构建系统，--emit-all 写出全部
+    if emit_all:
+        to_emit = [(name, text) for name, text in configs.items() if text]
+    elif main_config := configs.get(analyzer.build_system.value):
+        to_emit = [(analyzer.build_system.value, main_config)]
+    else:
+        to_emit = []
+
+    for name, text in to_emit:
+        config_file = analyzer.project_path / f"build_optimization_{name}.txt"
+        # 一次编码、一次写出，省去文本模式的增量编码缓冲
+        config_file.write_bytes(text.encode("utf-8"))
+        log.info(f"💾 构建配置已保存至: {config_file}")
 
     return success
 
 
-def main():
+# 进程内缓存的CLI解析器：定义是静态的，重复调用 main()（如嵌入式/
+# 批量场景）时复用首次构造的实例。不做磁盘pickle缓存——反序列化的
+# 开销与重建同量级，且从用户缓存目录 pickle.load 等于给任意代码
+# 执行开口子
+_parser = None
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """构造（并在进程内缓存）命令行解析器"""
+    global _parser
+    if _parser is not None:
+        return _parser
+
     parser = argparse.ArgumentParser(
         description="C++项目分析器 (Cpp-Turbo-Compile) - 提供编译优化建议",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -79,17 +298,30 @@ def main():
     parser.add_argument(
         "--pch-max-headers", type=int, default=25, help="PCH中包含的最大头文件数"
     )
+    # Boolean开关用 BooleanOptionalAction：一次声明同时生成 --X/--no-X
     parser.add_argument(
-        "--no-template-analysis", action="store_true", help="禁用模板分析"
+        "--template-analysis",
+        action=_BooleanOptionalAction,
+        default=True,
+        help="模板分析",
     )
     parser.add_argument(
-        "--no-circular-check", action="store_true", help="禁用循环依赖检查"
+        "--circular-check",
+        action=_BooleanOptionalAction,
+        default=True,
+        help="循环依赖检查",
     )
     parser.add_argument(
-        "--no-unused-check", action="store_true", help="禁用未使用头文件检查"
+        "--unused-check",
+        action=_BooleanOptionalAction,
+        default=True,
+        help="未使用头文件检查",
     )
     parser.add_argument(
-        "--no-parallel-analysis", action="store_true", help="禁用并行分析"
+        "--parallel-analysis",
+        action=_BooleanOptionalAction,
+        default=True,
+        help="并行分析",
     )
     parser.add_argument(
         "--analysis-timeout", type=int, default=30, help="文件分析超时时间(秒)"
@@ -99,23 +331,50 @@ def main():
     parser.add_argument("--pch", action="store_true", help="生成预编译头文件")
     parser.add_argument("--compile-pch", action="store_true", help="编译预编译头文件")
     parser.add_argument("--pch-name", default="pch.h", help="预编译头文件名")
-    parser.add_argument("--no-lto", action="store_true", help="禁用链接时优化")
-    parser.add_argument("--no-ipo", action="store_true", help="禁用过程间优化")
+    parser.add_argument(
+        "--lto", action=_BooleanOptionalAction, default=True, help="链接时优化"
+    )
+    parser.add_argument(
+        "--ipo", action=_BooleanOptionalAction, default=True, help="过程间优化"
+    )
     parser.add_argument("--pgo", action="store_true", help="启用性能导向优化")
     parser.add_argument("--unity-build", action="store_true", help="启用Unity构建")
-    parser.add_argument("--no-cache", action="store_true", help="禁用编译缓存")
-    parser.add_argument("--no-parallel-build", action="store_true", help="禁用并行构建")
+    parser.add_argument(
+        "--cache", action=_BooleanOptionalAction, default=True, help="编译缓存"
+    )
+    parser.add_argument(
+        "--parallel-build",
+        action=_BooleanOptionalAction,
+        default=True,
+        help="并行构建",
+    )
+    parser.add_argument(
+        "--emit-all",
+        action="store_true",
+        help="输出所有构建系统的优化配置（默认只输出当前构建系统）",
+    )
+    parser.add_argument(
+        "--pch-fingerprint-cache",
+        action="store_true",
+        help="缓存PCH指纹，内容未变时跳过重新编译",
+    )
+    parser.add_argument(
+        "--pch-max-size",
+        type=int,
+        default=64,
+        help="编译后PCH的体积上限(MB)，超限时自动剔除收益最差的头文件，0表示不限制",
+    )
 
     # 系统配置
     parser.add_argument(
         "--compiler",
-        choices=[c.value for c in config.enums.Compiler],
+        choices=_COMPILER_VALUES,
         default="gcc",
         help="指定编译器",
     )
     parser.add_argument(
         "--build-system",
-        choices=[b.value for b in config.enums.BuildSystem],
+        choices=_BUILD_SYSTEM_VALUES,
         default="cmake",
         help="指定构建系统",
     )
@@ -126,22 +385,34 @@ def main():
         help="忽略的文件或目录模式 (可多次使用)",
     )
 
-    args = parser.parse_args()
+    _parser = parser
+    return parser
+
+
+def main():
+    args = _build_parser().parse_args()
 
-    if not os.path.exists(args.project_path):
-        print(f"❌ 错误: 路径 '{args.project_path}' 不存在")
+    # 一次 resolve 同时完成存在性检查和路径规范化，后续 Path 运算不再重复解析
+    try:
+        project_path = Path(args.project_path).resolve(strict=True)
+    except FileNotFoundError:
+        log.error(f"❌ 错误: 路径 '{args.project_path}' 不存在")
         return 1
 
+    # 分析器模块较重（多进程、正则表等），待参数校验通过后再导入，
+    # --help 和路径错误等出口不必承担完整启动开销
+    from CppProjectAnalyzer import CppProjectAnalyzer
+
     # 创建配置对象
     analysis_config = AnalysisConfig(
         max_header_includes=args.max_includes,
         max_file_complexity=args.max_complexity,
         max_header_size=args.max_header_size,
         pch_max_headers=args.pch_max_headers,
-        enable_template_analysis=not args.no_template_analysis,
-        enable_circular_dep_check=not args.no_circular_check,
-        enable_unused_header_check=not args.no_unused_check,
-        parallel_analysis=not args.no_parallel_analysis,
+        enable_template_analysis=args.template_analysis,
+        enable_circular_dep_check=args.circular_check,
+        enable_unused_header_check=args.unused_check,
+        parallel_analysis=args.parallel_analysis,
         analysis_timeout=args.analysis_timeout,
     )
 
@@ -149,43 +420,60 @@ def main():
         generate_pch=args.pch,
         compile_pch=args.compile_pch,
         pch_name=args.pch_name,
-        enable_lto=not args.no_lto,
-        enable_ipo=not args.no_ipo,
+        enable_lto=args.lto,
+        enable_ipo=args.ipo,
         enable_pgo=args.pgo,
         unity_build=args.unity_build,
-        cache_compilation=not args.no_cache,
-        parallel_build=not args.no_parallel_build,
+        cache_compilation=args.cache,
+        parallel_build=args.parallel_build,
     )
 
     # 创建分析器实例
     analyzer = CppProjectAnalyzer(
-        project_path=args.project_path,
-        compiler=config.enums.Compiler(args.compiler),
-        build_system=config.enums.BuildSystem(args.build_system),
+        project_path=project_path,
+        compiler=_COMPILER_BY_VALUE[args.compiler],
+        build_system=_BUILD_SYSTEM_BY_VALUE[args.build_system],
         ignore_patterns=args.ignore_patterns or [],
         analysis_config=analysis_config,
         optimization_config=optimization_config,
     )
 
+    # 异常处理按阶段收窄：分析阶段只拦截可预期的文件访问错误并转成
+    # 干净的退出码，未知异常原样抛出带完整回溯；KeyboardInterrupt
+    # 统一在最外层处理，避免热路径上的宽泛except拖慢解释器
     try:
-        # 执行分析
-        analyzer.analyze_project()
+        try:
+            # 执行分析
+            analyzer.analyze_project()
+        except (FileNotFoundError, PermissionError) as e:
+            log.error(f"\n❌ 无法访问项目文件: {e}")
+            return 1
 
         # 执行优化流水线
-        if args.pch or args.compile_pch:
-            create_optimization_pipeline(analyzer)
+        if args.pch or args.compile_pch or args.pgo or args.emit_all:
+            try:
+                create_optimization_pipeline(
+                    analyzer,
+                    emit_all=args.emit_all,
+                    pch_fingerprint_cache=args.pch_fingerprint_cache,
+                    pch_max_size_mb=args.pch_max_size,
+                )
+            except OSError as e:
+                log.error(f"\n❌ 写入优化配置文件时出错: {e}")
+                return 1
 
         # 生成报告
-        analyzer.generate_report(args.output, "text")
+        try:
+            analyzer.generate_report(args.output, "text")
+        except OSError as e:
+            log.error(f"\n❌ 写入报告时出错: {e}")
+            return 1
 
-        print(f"\n🎉 分析完成！请查看报告获取详细优化建议。")
+        log.info("\n🎉 分析完成！请查看报告获取详细优化建议。")
 
     except KeyboardInterrupt:
-        print("\n⚠️  分析被用户中断")
+        log.warning("\n⚠️  分析被用户中断")
         return 130
-    except Exception as e:
-        print(f"\n❌ 分析过程中出错: {e}")
-        return 1
 
     return 0
 